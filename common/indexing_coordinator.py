@@ -68,13 +68,21 @@ class IndexingCoordinator:
             # Ensure directory exists
             os.makedirs(os.path.dirname(COORDINATION_FILE), exist_ok=True)
             
-            with open(COORDINATION_FILE, 'w') as f:
-                json.dump(coordination_data, f, indent=2)
+            # Write to a temp file and rename over the target so readers never see a
+            # partially written file (os.replace is atomic on POSIX and Windows)
+            tmp_file = f"{COORDINATION_FILE}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_file, 'w') as f:
+                    json.dump(coordination_data, f, indent=2)
+                os.replace(tmp_file, COORDINATION_FILE)
+            finally:
+                if os.path.exists(tmp_file):
+                    os.remove(tmp_file)
                 
             logger.info(f"📝 Saved coordination info: {source} {operation} at {timestamp}")
             return True
             
-        except (OSError, json.JSONEncodeError) as e:
+        except (OSError, TypeError, ValueError) as e:
             logger.warning(f"Could not save coordination file: {e}")
             return False
         except Exception as e:
@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace outgoing traffic (e.g. bytes per second).
+
+    consume() blocks until enough tokens have accumulated. Requests larger than the
+    bucket capacity are allowed; they simply wait for the corresponding refill time.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def consume(self, amount: float) -> float:
+        """Take amount tokens, sleeping if necessary. Returns the time waited in seconds."""
+        with self._lock:
+            self._refill()
+            wait = max(0.0, (amount - self._tokens) / self.rate)
+            # Tokens may go negative; later callers wait for the deficit to refill
+            self._tokens -= amount
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
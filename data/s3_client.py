@@ -9,11 +9,13 @@ It handles:
 - Caching and error handling
 """
 
+import codecs
+import itertools
 import json
 import logging
 import os
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import boto3
 from botocore.config import Config
@@ -21,8 +23,71 @@ from botocore.exceptions import ClientError
 
 from config import settings
 
+# orjson parses large product payloads several times faster; fall back to stdlib json
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
+# Bytes read per request when streaming objects from S3
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Incrementally decode a top-level JSON array from byte chunks, yielding each element.
+
+    Raises ValueError if the document is not a (complete) JSON array.
+    """
+    decoder = json.JSONDecoder()
+    pieces = codecs.iterdecode(chunks, "utf-8")
+    buffer = ""
+    pos = 0
+    started = False
+
+    while True:
+        piece = next(pieces, None)
+        at_end = piece is None
+        if not at_end:
+            buffer = buffer[pos:] + piece
+            pos = 0
+
+        while True:
+            # Skip whitespace and element separators
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+
+            if not started:
+                if buffer[pos] != "[":
+                    raise ValueError("document is not a JSON array")
+                started = True
+                pos += 1
+                continue
+
+            if buffer[pos] == "]":
+                return
+
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if at_end:
+                    raise
+                break  # Element continues in the next chunk
+
+            # A scalar ending exactly at the buffer edge may still be incomplete
+            if end >= len(buffer) and not at_end:
+                break
+            pos = end
+            yield element
+
+        if at_end:
+            raise ValueError("JSON array is truncated")
+
 
 class ProductS3Client:
     """Handles product-specific S3 operations"""
@@ -32,6 +97,8 @@ class ProductS3Client:
         self.bucket_name = bucket_name
         self.products_key = settings.S3_PRODUCTS_KEY
         self.cached_products = None
+        # LastModified of the products object as of the last get_object (load or stream)
+        self.last_modified = None
 
     def load_products(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """Load products from S3 with caching"""
@@ -42,7 +109,8 @@ class ProductS3Client:
             # Try to load from S3
             try:
                 response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.products_key)
-                products_data = json.loads(response["Body"].read().decode("utf-8"))
+                self.last_modified = response.get("LastModified")
+                products_data = _json_loads(response["Body"].read())
 
                 # Handle both array and object with products key
                 if isinstance(products_data, dict) and "products" in products_data:
@@ -64,8 +132,8 @@ class ProductS3Client:
                 if os.path.exists(local_path):
                     # Load products from local file if it exists
                     try:
-                        with open(local_path, "r") as f:
-                            products_data = json.load(f)
+                        with open(local_path, "rb") as f:
+                            products_data = _json_loads(f.read())
 
                             # Handle both array and object with products key
                             if isinstance(products_data, dict) and "products" in products_data:
@@ -91,6 +159,40 @@ class ProductS3Client:
             logger.error(f"❌ Error loading products: {e}")
             return []
 
+    def stream_products(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield products one at a time, parsing the S3 JSON array incrementally.
+
+        Reading stops as soon as limit products have been yielded, so small limits do not
+        download the whole catalog. Falls back to load_products() (including its local
+        file fallback) when S3 is unreachable or the object is not a top-level array.
+        """
+        if limit is not None and limit <= 0:
+            return
+
+        yielded = 0
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=self.products_key)
+            self.last_modified = response.get("LastModified")
+            body = response["Body"]
+            try:
+                for product in _iter_json_array(body.iter_chunks(STREAM_CHUNK_SIZE)):
+                    yield product
+                    yielded += 1
+                    if limit is not None and yielded >= limit:
+                        return
+            finally:
+                body.close()
+            return
+        except ClientError as e:
+            logger.warning(f"❌ S3 error while streaming products: {e}")
+        except ValueError as e:
+            if yielded:
+                raise
+            logger.info(f"Products object cannot be streamed ({e}) - loading in full")
+
+        products = self.load_products(force_refresh=True)
+        yield from itertools.islice(products, limit)
+
     def upload_products(self, file_path: str, create_backup: bool = True) -> bool:
         """Upload products from local JSON file to S3"""
         try:
@@ -190,8 +292,15 @@ class ProductS3Client:
         except Exception as e:
             logger.warning(f"⚠️ Product backup creation failed: {e}")
 
-    def get_last_modified(self) -> Optional[str]:
-        """Get last modified timestamp of products in S3"""
+    def get_last_modified(self, use_cached: bool = False) -> Optional[str]:
+        """Get last modified timestamp of products in S3
+
+        With use_cached=True, the timestamp seen by the last load/stream is returned
+        without a HEAD request - i.e. the version of the products that was actually read.
+        """
+        if use_cached and self.last_modified is not None:
+            return self.last_modified.isoformat()
+
         try:
             response = self.s3_client.head_object(Bucket=self.bucket_name, Key=self.products_key)
             return response["LastModified"].isoformat()
@@ -257,7 +366,7 @@ class SupportS3Client:
             response = self.s3_client.get_object(
                 Bucket=self.bucket_name, Key=self.support_knowledge_key
             )
-            support_data = json.loads(response["Body"].read().decode("utf-8"))
+            support_data = _json_loads(response["Body"].read())
 
             # Validate data structure
             if not self.validate_support_data(support_data):
@@ -533,9 +642,13 @@ class UnifiedS3Client:
             logger.error(f"❌ Failed to update products in S3: {e}")
             return False
 
-    def get_products_last_modified(self) -> Optional[str]:
+    def stream_products(self, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Stream products from S3 one at a time - see ProductS3Client.stream_products"""
+        return self.product_client.stream_products(limit)
+
+    def get_products_last_modified(self, use_cached: bool = False) -> Optional[str]:
         """Get last modified timestamp of products in S3 - backward compatible method"""
-        return self.product_client.get_last_modified()
+        return self.product_client.get_last_modified(use_cached)
 
     # Unified data operations
     def upload_data(
@@ -13,6 +13,7 @@ Logging Features:
 - Context-rich error messages with emoji prefixes
 """
 
+import fcntl
 import hashlib
 import hmac
 import logging
@@ -22,7 +23,21 @@ import subprocess
 from flask import Flask, jsonify, request
 
 # Create logs directory if it doesn't exist
-os.makedirs("/opt/chatbot/logs/webhook", exist_ok=True)
+LOG_DIR = "/opt/chatbot/logs/webhook"
+os.makedirs(LOG_DIR, exist_ok=True)
+
+# Deployment runs detached from the request; its output goes to its own log file and a
+# lock file ensures only one deployment runs at a time
+DEPLOY_LOG_FILE = os.path.join(LOG_DIR, "deploy.log")
+DEPLOY_LOCK_FILE = "/tmp/chatbot_deploy.lock"
+DEPLOY_TIMEOUT_SECONDS = 180
+DEPLOY_SCRIPT = """
+cd /opt/chatbot || { echo "Error: /opt/chatbot directory not found"; exit 1; } &&
+git pull origin master &&
+source venv/bin/activate &&
+pip install -r requirements.txt &&
+sudo systemctl restart chatbot chatbot-webhook
+"""
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -46,11 +61,45 @@ if not GITHUB_SECRET:
 
 def verify_signature(payload, signature):
     """Verify GitHub webhook signature for security"""
-    if not signature:
+    if not signature or not signature.startswith("sha256="):
+        return False
+
+    # Compare raw digests: no hex string to build, and a malformed (e.g. non-ASCII)
+    # header is rejected instead of raising TypeError in compare_digest
+    try:
+        received = bytes.fromhex(signature.removeprefix("sha256="))
+    except ValueError:
         return False
 
-    expected = "sha256=" + hmac.new(GITHUB_SECRET, payload, hashlib.sha256).hexdigest()
-    return hmac.compare_digest(expected, signature)
+    expected = hmac.new(GITHUB_SECRET, payload, hashlib.sha256).digest()
+    return hmac.compare_digest(expected, received)
+
+
+def start_deployment():
+    """Start the deployment script in the background; returns False if one is already running
+
+    The child inherits the locked lock file, so the lock is held until the deployment
+    exits (even after this webhook process is restarted by it).
+    """
+    lock_fd = os.open(DEPLOY_LOCK_FILE, os.O_CREAT | os.O_WRONLY, 0o644)
+    try:
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+
+        with open(DEPLOY_LOG_FILE, "ab") as deploy_log:
+            subprocess.Popen(
+                ["timeout", str(DEPLOY_TIMEOUT_SECONDS), "/bin/bash", "-c", DEPLOY_SCRIPT],
+                stdin=subprocess.DEVNULL,
+                stdout=deploy_log,
+                stderr=subprocess.STDOUT,
+                pass_fds=(lock_fd,),
+                start_new_session=True,
+            )
+        return True
+    finally:
+        os.close(lock_fd)
 
 
 @app.route("/webhook", methods=["POST"])
@@ -77,35 +126,20 @@ def handle_webhook():
         try:
             logger.info("🚀 Triggering auto-deployment...")
 
-            # Simple deployment: pull latest code and restart
-            result = subprocess.run(
-                [
-                    "/bin/bash",
-                    "-c",
-                    """
-                cd /opt/chatbot || { echo "Error: /opt/chatbot directory not found"; exit 1; } && 
-                git pull origin master && 
-                source venv/bin/activate && 
-                pip install -r requirements.txt && 
-                sudo systemctl restart chatbot chatbot-webhook
-                """,
-                ],
-                capture_output=True,
-                text=True,
-                timeout=180,
-            )
+            # Simple deployment: pull latest code and restart. It runs detached so GitHub
+            # gets an immediate answer instead of waiting (and retrying) on a long deploy
+            if not start_deployment():
+                logger.warning("⚠️ Deployment already in progress - not starting another")
+                return (
+                    jsonify({"status": "busy", "message": "Deployment already in progress"}),
+                    409,
+                )
 
-            if result.returncode == 0:
-                logger.info("✅ Deployment successful")
-                return jsonify({"status": "success", "message": "Deployed successfully"})
-            else:
-                logger.error(f"❌ Deployment failed: {result.stderr}")
-                return jsonify({"status": "error", "message": "Deployment failed"}), 500
+            logger.info(f"✅ Deployment started (output: {DEPLOY_LOG_FILE})")
+            return jsonify({"status": "accepted", "message": "Deployment started"}), 202
 
-        except subprocess.TimeoutExpired:
-            logger.error("❌ Deployment timed out after 180 seconds")
-            return jsonify({"status": "error", "message": "Deployment timeout"}), 500
         except Exception as e:
+            logger.error(f"❌ Could not start deployment: {e}")
             return jsonify({"status": "error", "message": str(e)}), 500
 
     return jsonify({"status": "ignored", "message": f"Ignored {event} event"})
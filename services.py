@@ -23,11 +23,9 @@ import redis
 # Initialize logger for this module
 logger = logging.getLogger(__name__)
 
-from vector_service.pinecone_client import (
-    PineconeClient,
-    pinecone_products_client,
-    pinecone_support_client,
-)
+# The global clients are created lazily by the module on first attribute access
+import vector_service.pinecone_client as pinecone_client
+from vector_service.pinecone_client import PineconeClient
 
 
 class ServiceConnections:
@@ -94,7 +92,7 @@ class ServiceConnections:
         - Add error recovery
         """
         if not cls._pinecone_products_client:
-            cls._pinecone_products_client = pinecone_products_client
+            cls._pinecone_products_client = pinecone_client.pinecone_products_client
             if not cls._pinecone_products_client.is_available():
                 raise Exception("PINECONE_API_KEY is required for Product Search")
         return cls._pinecone_products_client
@@ -111,7 +109,7 @@ class ServiceConnections:
         - Add error recovery
         """
         if not cls._pinecone_support_client:
-            cls._pinecone_support_client = pinecone_support_client
+            cls._pinecone_support_client = pinecone_client.pinecone_support_client
             if not cls._pinecone_support_client.is_available():
                 raise Exception("PINECONE_API_KEY is required for Support RAG")
         return cls._pinecone_support_client
@@ -1,3 +1,4 @@
+import hashlib
 import logging
 import re
 import time
@@ -10,6 +11,31 @@ from bs4 import BeautifulSoup
 
 from data.s3_client import s3_client
 
+# Near-duplicate detection: 64-bit SimHash over word 3-shingles, items within
+# this Hamming distance of an already-kept item are treated as duplicates.
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 3
+_WORD_RE = re.compile(r"\w+")
+
+
+def _simhash(text: str) -> int:
+    """Compute a 64-bit SimHash fingerprint of the text's word shingles"""
+    tokens = _WORD_RE.findall(text.lower())
+    shingles = [" ".join(tokens[i : i + 3]) for i in range(len(tokens) - 2)] or [" ".join(tokens)]
+
+    weights = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        digest = hashlib.blake2b(shingle.encode("utf-8"), digest_size=SIMHASH_BITS // 8).digest()
+        value = int.from_bytes(digest, byteorder="big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (value >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
 
 class WebPolicyScraper:
     """Handles all web scraping logic for e-commerce policies"""
@@ -678,14 +704,17 @@ class KnowledgeProvider:
         self, knowledge_items: List[Dict[str, Any]]
     ) -> List[Dict[str, Any]]:
         """Remove duplicates and enrich knowledge items with consistent structure"""
-        # Simple deduplication by content similarity
-        seen_content = set()
+        # Near-duplicate detection by SimHash fingerprint of the content
+        seen_fingerprints: List[int] = []
         unique_items = []
 
         for item in knowledge_items:
-            content_key = item.get("content", "")[:100].lower()  # First 100 chars for comparison
-            if content_key not in seen_content:
-                seen_content.add(content_key)
+            fingerprint = _simhash(item.get("content", ""))
+            if all(
+                (fingerprint ^ seen).bit_count() > SIMHASH_MAX_DISTANCE
+                for seen in seen_fingerprints
+            ):
+                seen_fingerprints.append(fingerprint)
 
                 # Ensure consistent structure
                 if "title" not in item and "type" in item:
@@ -736,19 +765,14 @@ class KnowledgeProvider:
         """Get comprehensive summary of all knowledge sources"""
         knowledge = self.get_all_knowledge()
 
-        # Count by source
-        source_counts = {}
-        category_counts = {}
-        type_counts = {}
-
-        for item in knowledge:
-            source = item.get("source", "unknown")
-            category = item.get("category", "unknown")
-            type_name = item.get("type", "unknown")
+        # Count by source, category and type
+        source_counts = Counter(item.get("source", "unknown") for item in knowledge)
+        category_counts = Counter(item.get("category", "unknown") for item in knowledge)
+        type_counts = Counter(item.get("type", "unknown") for item in knowledge)
 
-            source_counts[source] = source_counts.get(source, 0) + 1
-            category_counts[category] = category_counts.get(category, 0) + 1
-            type_counts[type_name] = type_counts.get(type_name, 0) + 1
+        # Detect content origins from the distinct sources instead of rescanning all items
+        has_web_scraped_content = any("scraped_" in source for source in source_counts)
+        has_product_content = any("product_" in source for source in source_counts)
 
         # Get product summary if available
         product_summary = {}
@@ -759,12 +783,10 @@ class KnowledgeProvider:
 
         return {
             "total_knowledge_items": len(knowledge),
-            "source_breakdown": source_counts,
-            "category_breakdown": category_counts,
-            "type_breakdown": type_counts,
+            "source_breakdown": dict(source_counts),
+            "category_breakdown": dict(category_counts),
+            "type_breakdown": dict(type_counts),
             "product_summary": product_summary,
-            "has_web_scraped_content": any(
-                "scraped_" in item.get("source", "") for item in knowledge
-            ),
-            "has_product_content": any("product_" in item.get("source", "") for item in knowledge),
+            "has_web_scraped_content": has_web_scraped_content,
+            "has_product_content": has_product_content,
         }
@@ -0,0 +1,96 @@
+"""
+Semantic Query Cache for Support RAG
+
+Caches generated support answers keyed by the query embedding. A new question
+whose embedding has cosine similarity >= threshold with a cached question reuses
+the cached answer, skipping the Pinecone search and LLM generation entirely.
+Entries expire after ttl_seconds so answers never outlive knowledge base edits
+by much, even without a full re-initialization.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticQueryCache:
+    """In-process LRU cache of answers keyed by query embedding similarity"""
+
+    def __init__(self, threshold: float = 0.95, max_entries: int = 1000, ttl_seconds: float = 3600):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # entry id -> (normalized embedding, answer, citations, expiry); ordered by recency
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, str, List[str], float]]" = OrderedDict()
+        self._next_id = 0
+        # Stacked embeddings of all entries, rebuilt lazily after inserts/evictions
+        self._matrix: Optional[np.ndarray] = None
+        self._matrix_ids: List[int] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+        return vector / norm
+
+    def get(self, embedding: List[float]) -> Optional[Tuple[str, List[str]]]:
+        """Return (answer, citations) for the most similar cached query, if similar enough"""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        with self._lock:
+            if not self._entries:
+                return None
+            if self._matrix is None:
+                self._matrix_ids = list(self._entries)
+                self._matrix = np.vstack([self._entries[i][0] for i in self._matrix_ids])
+            if self._matrix.shape[1] != query.shape[0]:
+                return None
+
+            similarities = self._matrix @ query
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+
+            entry_id = self._matrix_ids[best]
+            entry = self._entries.get(entry_id)
+            if entry is None:
+                return None
+            _, answer, citations, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[entry_id]
+                self._matrix = None
+                return None
+            self._entries.move_to_end(entry_id)
+            return answer, list(citations)
+
+    def put(self, embedding: List[float], answer: str, citations: List[str]) -> None:
+        """Cache an answer for the given query embedding, evicting the least recently used"""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        with self._lock:
+            expires_at = time.monotonic() + self.ttl_seconds
+            self._entries[self._next_id] = (vector, answer, list(citations), expires_at)
+            self._next_id += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def clear(self) -> None:
+        """Drop all cached answers"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._matrix_ids = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
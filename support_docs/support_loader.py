@@ -1,21 +1,58 @@
 import asyncio
+import itertools
 import logging
-from typing import Any, Dict, List
+import re
+from typing import Any, Dict, List, Tuple
 
-from vector_service.pinecone_client import pinecone_support_client
+import vector_service.pinecone_client as pinecone_client
 
 from .FAQ_Knowledge_base import KnowledgeProvider, ProductPolicyScraper
+from .query_cache import SemanticQueryCache
 
 logger = logging.getLogger(__name__)
 
+_WORD_RE = re.compile(r"[a-z]+")
+
+# Keyword-based fallback answers, checked in order: (keywords, phrases, response).
+# Keyword sets include common inflections since messages are matched by whole tokens.
+_FALLBACK_BUCKETS = [
+    (
+        frozenset(
+            {"return", "returns", "returned", "returning", "refund", "refunds", "refunded"}
+        ),
+        ("send back",),
+        "Our return policies vary by product. Most items can be returned within 15-90 days in original condition. Please check the specific return policy for your item or contact customer service for assistance.",
+    ),
+    (
+        frozenset(
+            {"shipping", "delivery", "deliveries", "ship", "ships", "shipped", "shipment"}
+        ),
+        (),
+        "Shipping times vary by product and location. Most items ship within 1-3 business days with standard delivery in 3-7 days. Express and overnight options are available for many products.",
+    ),
+    (
+        frozenset({"warranty", "warranties", "guarantee", "guaranteed", "guarantees"}),
+        (),
+        "Products come with manufacturer warranties that vary by brand and product type. Extended warranties may be available for electronics and other items.",
+    ),
+    (
+        frozenset({"defective", "broken", "damaged", "problem", "problems"}),
+        (),
+        "If you received a defective item, please contact our customer service team immediately. We'll arrange for a replacement or refund at no cost to you.",
+    ),
+]
+_FALLBACK_DEFAULT_RESPONSE = "I'm here to help with your questions. Please contact our customer service team for specific assistance with orders, returns, shipping, or product issues."
+
 
 class SupportLoader:
     def __init__(self, llm_service=None):
-        self.pinecone_support = pinecone_support_client
+        self.pinecone_support = pinecone_client.pinecone_support_client
         self.policy_extractor = ProductPolicyScraper()
         self.knowledge_provider = KnowledgeProvider()
         self.llm_service = llm_service
         self._is_initialized = False
+        # Answers to previous questions, reused for near-identical queries
+        self.query_cache = SemanticQueryCache(threshold=0.95, max_entries=1000, ttl_seconds=3600)
         # For lightweight analytics
         self._last_citations: List[str] = []
         self._last_mode: str = "init"  # one of: init, rag, fallback
@@ -55,9 +92,11 @@ class SupportLoader:
                 # Get additional FAQ data (now includes hybrid static + scraped)
                 faq_docs = self.knowledge_provider.get_all_knowledge()
 
-                # Combine all support documents
-                all_support_docs = product_support_docs + faq_docs
-                logger.info(f"📊 Generated {len(all_support_docs)} support documents")
+                # Stream both sources without building a combined list
+                all_support_docs = itertools.chain(product_support_docs, faq_docs)
+                logger.info(
+                    f"📊 Generated {len(product_support_docs) + len(faq_docs)} support documents"
+                )
 
             # Clear existing index and upload new data
             logger.info("🔄 Updating Pinecone support knowledge base...")
@@ -69,6 +108,8 @@ class SupportLoader:
             if successful_upserts > 0:
                 logger.info(f"✅ Support knowledge base initialized with {successful_upserts} documents")
                 self._is_initialized = True
+                # Cached answers may reflect the previous knowledge base
+                self.query_cache.clear()
                 return True
             else:
                 logger.error("❌ Failed to initialize support knowledge base")
@@ -91,8 +132,17 @@ class SupportLoader:
             return self._fallback_support_response(user_message)
 
         try:
-            # Search for relevant support documents
-            relevant_docs = self.pinecone_support.search_support(user_message, top_k=3)
+            # Blocking HF/Pinecone calls run in a worker thread to keep the event loop free
+            query_embedding, cached, relevant_docs = await asyncio.to_thread(
+                self._retrieve, user_message
+            )
+
+            # Reuse the answer to a near-identical earlier question
+            if cached:
+                response, citations = cached
+                self._last_citations = citations
+                self._last_mode = "rag"
+                return response
 
             if not relevant_docs:
                 return self._fallback_support_response(user_message)
@@ -129,12 +179,17 @@ class SupportLoader:
             context_text = "\n".join(context_parts)
 
             # Generate response with LLM
-            response = await self._generate_response_with_context(user_message, context_text)
+            response, generated = await self._generate_response_with_context(
+                user_message, context_text
+            )
             # Append citations (if any)
             if citation_text:
                 response = f"{response}\n\n{citation_text}"
             # Mark mode as RAG
             self._last_mode = "rag"
+            # Degraded answers (LLM error or empty reply) must not be reused for later questions
+            if generated:
+                self.query_cache.put(query_embedding, response, self._last_citations)
             return response
 
         except Exception as e:
@@ -143,11 +198,37 @@ class SupportLoader:
             self._last_citations = []
             return self._fallback_support_response(user_message)
 
-    async def _generate_response_with_context(self, user_message: str, context: str) -> str:
-        """Generate response using LLM with retrieved context"""
+    def _retrieve(self, user_message: str):
+        """Embed the query once, then check the answer cache and search Pinecone (blocking).
+
+        Returns (query_embedding, cached_answer, relevant_docs); on a cache hit the
+        Pinecone search is skipped and relevant_docs is empty.
+        """
+        query_embedding = self.pinecone_support.embed_query(user_message)
+
+        cached = self.query_cache.get(query_embedding)
+        if cached:
+            return query_embedding, cached, []
+
+        relevant_docs = self.pinecone_support.search_support(
+            user_message, top_k=3, query_embedding=query_embedding
+        )
+        return query_embedding, None, relevant_docs
+
+    async def _generate_response_with_context(
+        self, user_message: str, context: str
+    ) -> Tuple[str, bool]:
+        """Generate response using LLM with retrieved context
+
+        Returns (response, generated); generated is False when a fallback answer was
+        returned instead of an LLM reply, so callers know not to cache it.
+        """
         if not self.llm_service:
             # Simple context-based response without LLM
-            return f"Based on our policies: {context.split('-')[1].strip() if '-' in context else context}"
+            return (
+                f"Based on our policies: {context.split('-')[1].strip() if '-' in context else context}",
+                False,
+            )
 
         prompt = f"""You are a helpful customer service assistant. Answer the customer's question based on the support information provided.
 
@@ -167,38 +248,28 @@ Answer:"""
         try:
             # Use existing LLM service
             response = await asyncio.to_thread(self.llm_service._generate_with_llm, prompt)
-            return (
-                response.strip()
-                if response
-                else "I'm here to help based on our policies. Could you provide a bit more detail?"
-            )
+            if response and response.strip():
+                return response.strip(), True
+            return "I'm here to help based on our policies. Could you provide a bit more detail?", False
         except Exception as e:
             logger.error(f"Error generating LLM response for query '{user_message[:50]}...': {e}", exc_info=True)
             # Extract first relevant piece of information as fallback
             if context:
                 first_info = context.split("\n")[0].replace("- ", "")
-                return f"Based on our policies: {first_info}"
-            return "I'm sorry, I couldn't process your request at this time."
+                return f"Based on our policies: {first_info}", False
+            return "I'm sorry, I couldn't process your request at this time.", False
 
     def _fallback_support_response(self, user_message: str) -> str:
         """Fallback support responses when RAG is not available"""
         message_lower = user_message.lower()
+        tokens = set(_WORD_RE.findall(message_lower))
 
         # Simple keyword-based fallback (better than the old hardcoded version)
-        if any(word in message_lower for word in ["return", "refund", "send back"]):
-            return "Our return policies vary by product. Most items can be returned within 15-90 days in original condition. Please check the specific return policy for your item or contact customer service for assistance."
-
-        elif any(word in message_lower for word in ["shipping", "delivery", "ship"]):
-            return "Shipping times vary by product and location. Most items ship within 1-3 business days with standard delivery in 3-7 days. Express and overnight options are available for many products."
-
-        elif any(word in message_lower for word in ["warranty", "guarantee"]):
-            return "Products come with manufacturer warranties that vary by brand and product type. Extended warranties may be available for electronics and other items."
-
-        elif any(word in message_lower for word in ["defective", "broken", "damaged", "problem"]):
-            return "If you received a defective item, please contact our customer service team immediately. We'll arrange for a replacement or refund at no cost to you."
+        for keywords, phrases, response in _FALLBACK_BUCKETS:
+            if tokens & keywords or any(phrase in message_lower for phrase in phrases):
+                return response
 
-        else:
-            return "I'm here to help with your questions. Please contact our customer service team for specific assistance with orders, returns, shipping, or product issues."
+        return _FALLBACK_DEFAULT_RESPONSE
 
     def get_support_stats(self) -> Dict[str, Any]:
         """Get statistics about the support knowledge base"""
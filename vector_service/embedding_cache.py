@@ -0,0 +1,269 @@
+"""
+Persistent Embedding Cache
+
+This module provides a small SQLite-backed cache for Hugging Face embeddings so
+that identical texts (FAQ reloads, reindexing runs, repeated user queries) are
+not re-embedded over the network. Entries are keyed by sha256(model + text), so
+switching embedding models never returns stale vectors.
+
+SQLite is used instead of shelve/dbm because it handles concurrent access from
+multiple worker processes safely. When REDIS_URL is set, Redis is used as a shared
+first tier (with a TTL) so all instances reuse each other's embeddings. Both tiers
+store vectors as raw float32 bytes: 4x smaller than JSON and decoded without parsing.
+A bounded in-process LRU sits in front of both, so hot texts (repeated queries)
+are served without a Redis round trip or SQLite lookup.
+
+Only document embeddings are written to SQLite, and the file is capped at
+MAX_ROWS (oldest rows are pruned). Query embeddings stay in memory and Redis, so
+unique user queries never accumulate on disk.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Default cache location (relative to the working directory)
+DEFAULT_CACHE_PATH = ".cache/embeddings.sqlite3"
+
+# Redis tier: key prefix and expiry so vectors from retired models age out
+REDIS_KEY_PREFIX = "emb:"
+REDIS_TTL_SECONDS = 30 * 24 * 3600
+# After a Redis error the tier is skipped for this long, then tried again
+REDIS_RETRY_SECONDS = 60
+
+# In-process LRU tier: max embeddings held in memory (0 disables it)
+MEMORY_CACHE_SIZE = int(os.getenv("EMBEDDING_MEMORY_CACHE_SIZE", "4096"))
+
+# SQLite tier: max rows kept on disk; the oldest writes are pruned every PRUNE_EVERY_ROWS
+MAX_ROWS = int(os.getenv("EMBEDDING_CACHE_MAX_ROWS", "100000"))
+PRUNE_EVERY_ROWS = 1000
+
+
+class EmbeddingCache:
+    """File-backed embedding cache keyed by content hash"""
+
+    def __init__(self, path: Optional[str] = None, redis_url: Optional[str] = None):
+        self.path = path or os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self._lock = threading.Lock()
+        self._conn = None
+        self._redis_client = self._init_redis(redis_url or os.getenv("REDIS_URL"))
+        self._redis_retry_at = 0.0
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        self._rows_since_prune = 0
+
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            # vector holds float32 bytes (older rows may still hold JSON text)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._conn.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding cache disabled - could not open {self.path}: {e}")
+            self._conn = None
+
+    @staticmethod
+    def _init_redis(redis_url: Optional[str]):
+        """Create a binary Redis client (connects lazily on first command)"""
+        if not redis_url:
+            return None
+        try:
+            import redis
+
+            return redis.from_url(redis_url, socket_timeout=2, socket_connect_timeout=2)
+        except Exception as e:
+            logger.warning(f"⚠️ Redis embedding cache disabled: {e}")
+            return None
+
+    @property
+    def _redis(self):
+        """The Redis client, or None if unconfigured or cooling down after an error"""
+        if self._redis_retry_at and time.monotonic() < self._redis_retry_at:
+            return None
+        return self._redis_client
+
+    def _disable_redis(self, error: Exception) -> None:
+        """Skip Redis for a while after an error so every lookup does not wait on a dead server"""
+        logger.warning(
+            f"⚠️ Redis embedding cache paused for {REDIS_RETRY_SECONDS}s after error: {error}"
+        )
+        self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        """Build the cache key for a text embedded with the given model"""
+        return hashlib.sha256((model + "\x1f" + text).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _encode(vector: List[float]) -> bytes:
+        """Serialize an embedding as raw float32 bytes (4 bytes per dimension)"""
+        return np.asarray(vector, dtype=np.float32).tobytes()
+
+    @staticmethod
+    def _decode(value) -> List[float]:
+        """Deserialize float32 bytes, or JSON text written by older versions"""
+        if isinstance(value, str):
+            return json.loads(value)
+        return np.frombuffer(value, dtype=np.float32).tolist()
+
+    def is_available(self) -> bool:
+        """Check if any cache backend is usable"""
+        return MEMORY_CACHE_SIZE > 0 or self._conn is not None or self._redis_client is not None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        """Return cached embeddings for the given keys (misses are omitted)
+
+        Returned lists may be shared with the memory tier; callers must not mutate them.
+        """
+        keys = list(keys)
+        if not self.is_available() or not keys:
+            return {}
+
+        found = self._get_many_memory(keys)
+        remaining = [key for key in keys if key not in found]
+        if not remaining:
+            return found
+
+        loaded: Dict[str, List[float]] = {}
+        redis_client = self._redis
+        if redis_client is not None:
+            try:
+                values = redis_client.mget([REDIS_KEY_PREFIX + key for key in remaining])
+                for key, value in zip(remaining, values):
+                    if value is not None:
+                        loaded[key] = self._decode(value)
+            except Exception as e:
+                self._disable_redis(e)
+
+        remaining = [key for key in remaining if key not in loaded]
+        if remaining and self._conn is not None:
+            loaded.update(self._get_many_sqlite(remaining))
+
+        # Promote hits from the slower tiers so the next lookup stays in process
+        self._set_many_memory(loaded)
+        found.update(loaded)
+        return found
+
+    def _get_many_memory(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Look up embeddings in the in-process LRU, marking hits as recently used"""
+        if MEMORY_CACHE_SIZE <= 0:
+            return {}
+        found = {}
+        with self._memory_lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+        return found
+
+    def _set_many_memory(self, items: Dict[str, List[float]]) -> None:
+        """Store embeddings in the in-process LRU, evicting the least recently used"""
+        if MEMORY_CACHE_SIZE <= 0 or not items:
+            return
+        with self._memory_lock:
+            for key, vector in items.items():
+                self._memory[key] = vector
+                self._memory.move_to_end(key)
+            while len(self._memory) > MEMORY_CACHE_SIZE:
+                self._memory.popitem(last=False)
+
+    def _get_many_sqlite(self, keys: List[str]) -> Dict[str, List[float]]:
+        """Look up embeddings in the local SQLite file"""
+        try:
+            placeholders = ",".join("?" * len(keys))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", keys
+                ).fetchall()
+            return {key: self._decode(vector) for key, vector in rows}
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+            return {}
+
+    def set_many(self, items: Dict[str, List[float]], persist: bool = True) -> None:
+        """Store embeddings by key
+
+        persist=False keeps them in memory and Redis only (used for query embeddings).
+        """
+        if not self.is_available() or not items:
+            return
+
+        self._set_many_memory(items)
+
+        redis_client = self._redis
+        if redis_client is not None:
+            try:
+                pipeline = redis_client.pipeline(transaction=False)
+                for key, vector in items.items():
+                    pipeline.setex(REDIS_KEY_PREFIX + key, REDIS_TTL_SECONDS, self._encode(vector))
+                pipeline.execute()
+            except Exception as e:
+                self._disable_redis(e)
+
+        if not persist or self._conn is None:
+            return
+
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, self._encode(vector)) for key, vector in items.items()],
+                )
+                self._rows_since_prune += len(items)
+                if self._rows_since_prune >= PRUNE_EVERY_ROWS:
+                    self._prune()
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"Embedding cache write failed: {e}")
+
+    def _prune(self) -> None:
+        """Delete the oldest rows beyond MAX_ROWS (caller holds the lock)
+
+        INSERT OR REPLACE gives rewritten keys a new rowid, so rowid order is write order.
+        """
+        self._rows_since_prune = 0
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid < "
+            "(SELECT rowid FROM embeddings ORDER BY rowid DESC LIMIT 1 OFFSET ?)",
+            (max(MAX_ROWS - 1, 0),),
+        )
+
+
+# Global instance shared by all Pinecone clients (keys include the model name), created on
+# first use so importing this module does not create the cache directory or open SQLite
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Return the process-wide embedding cache, creating it on first call"""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+    return _embedding_cache
+
+
+def __getattr__(name: str) -> EmbeddingCache:
+    # Backward compatible module attribute: embedding_cache
+    if name == "embedding_cache":
+        return get_embedding_cache()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
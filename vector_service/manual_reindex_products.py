@@ -20,25 +20,15 @@ Flags:
 import argparse
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
-
-from dotenv import load_dotenv
 
 # Ensure project root is importable
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
-# Load environment variables
-load_dotenv()
-
-from data.s3_client import s3_client  # noqa: E402
-from .pinecone_client import pinecone_products_client  # noqa: E402
-from common.indexing_coordinator import indexing_coordinator  # noqa: E402
-
-logging.basicConfig(level=logging.INFO, format="%(message)s")
 logger = logging.getLogger("manual_reindex_products")
 
 
@@ -65,6 +55,18 @@ def main():
     parser.add_argument("--yes", action="store_true", help="Skip interactive confirmations")
     args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # Load environment and heavy clients (boto3, Pinecone SDK) only when actually running,
+    # so importing this module or running --help stays fast
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    from common.indexing_coordinator import indexing_coordinator
+    from data.s3_client import s3_client
+    from vector_service.pinecone_client import pinecone_products_client
+
     # Check Pinecone availability
     if not pinecone_products_client.is_available():
         logger.error(
@@ -72,19 +74,14 @@ def main():
         )
         sys.exit(1)
 
-    # Load products
-    products: List[Dict[str, Any]] = s3_client.load_products(force_refresh=True)
-    total = len(products or [])
-    logger.info(f"📦 Loaded {total} products from S3/local")
-    
-    # Get S3 timestamp for coordination
-    s3_timestamp = s3_client.get_products_last_modified()
-
-    if args.limit is not None and args.limit >= 0:
-        products = products[: args.limit]
-        logger.info(f"⚠️ Limiting to first {len(products)} products as requested")
+    # Products are streamed, so --limit stops reading S3 after N products
+    limit = args.limit if args.limit is not None and args.limit >= 0 else None
+    if limit is not None:
+        logger.info("⚠️ Limited to first %d products as requested", limit)
 
     if args.dry_run:
+        product_count = sum(1 for _ in s3_client.stream_products(limit=limit))
+        logger.info("📦 Found %d products in S3/local", product_count)
         logger.info("✅ Dry-run complete. Nothing was written to Pinecone.")
         sys.exit(0)
 
@@ -95,40 +92,61 @@ def main():
         minutes_ago = recent_indexing.get("minutes_ago", 0)
         operation = recent_indexing.get("operation", "unknown")
         
-        logger.warning(f"⚠️ Recent indexing detected:")
-        logger.warning(f"   Indexed by: {indexed_by}")
-        logger.warning(f"   Operation: {operation}")
-        logger.warning(f"   Time: {minutes_ago} minutes ago")
+        logger.warning("⚠️ Recent indexing detected:")
+        logger.warning("   Indexed by: %s", indexed_by)
+        logger.warning("   Operation: %s", operation)
+        logger.warning("   Time: %s minutes ago", minutes_ago)
         
         if not confirm("Continue despite recent indexing activity?", assume_yes=args.yes):
             logger.info("❌ Aborted due to potential coordination conflict.")
             sys.exit(1)
 
-    # Optionally clear product vectors first
-    if args.clear:
-        if not confirm(
-            "This will DELETE all product vectors in Pinecone. Continue?", assume_yes=args.yes
-        ):
-            logger.info("❌ Aborted by user.")
-            sys.exit(1)
-        ok = pinecone_products_client.clear_index({"type": "product"})
-        if not ok:
-            logger.error("❌ Failed to clear product vectors. Aborting.")
-            sys.exit(1)
-        logger.info("🧹 Cleared existing product vectors.")
+    # Confirm destructive clear before anything is written
+    if args.clear and not confirm(
+        "This will DELETE all product vectors in Pinecone. Continue?", assume_yes=args.yes
+    ):
+        logger.info("❌ Aborted by user.")
+        sys.exit(1)
 
     # Confirm indexing
-    if not confirm(
-        f"Proceed to index {len(products)} products into Pinecone?", assume_yes=args.yes
-    ):
+    scope = f"the first {limit}" if limit is not None else "all"
+    if not confirm(f"Proceed to index {scope} products into Pinecone?", assume_yes=args.yes):
         logger.info("❌ Aborted by user.")
         sys.exit(1)
 
-    # Index
-    ok = pinecone_products_client.index_products(products)
-    if not ok:
-        logger.error("❌ Reindexing failed.")
+    with ThreadPoolExecutor(max_workers=1) as clear_executor:
+        # Clear in the background; the first batches are embedded meanwhile and
+        # index_products_batched holds all upserts until the delete has finished
+        clear_future = None
+        if args.clear:
+            clear_future = clear_executor.submit(
+                pinecone_products_client.clear_index, {"type": "product"}
+            )
+
+        # Index in batches so each batch is embedded and upserted before the next is built
+        try:
+            indexed_count = pinecone_products_client.index_products_batched(
+                s3_client.stream_products(limit=limit),
+                batch_size=100,
+                wait_for=clear_future,
+                skip_unchanged=not args.clear,
+            )
+        except Exception as e:
+            indexed_count = None
+            logger.error("❌ Reindexing failed: %s", e)
+
+        if clear_future is not None:
+            if not clear_future.result():
+                logger.error("❌ Failed to clear product vectors. Aborting.")
+                sys.exit(1)
+            logger.info("🧹 Cleared existing product vectors.")
+
+    if indexed_count is None:
         sys.exit(1)
+    logger.info("✅ Indexed %d products", indexed_count)
+
+    # S3 timestamp of the products just streamed (no extra HEAD request needed)
+    s3_timestamp = s3_client.get_products_last_modified(use_cached=True)
 
     # Update coordination info after successful indexing
     operation = "clear_and_index" if args.clear else "index"
@@ -136,13 +154,13 @@ def main():
         timestamp=datetime.now().isoformat(),
         source="manual_script",
         operation=operation,
-        product_count=len(products),
+        product_count=indexed_count,
         s3_timestamp=s3_timestamp
     )
 
     # Health
     health = pinecone_products_client.get_health()
-    logger.info(f"✅ Manual reindexing complete. Pinecone status: {health}")
+    logger.info("✅ Manual reindexing complete. Pinecone status: %s", health)
 
 
 if __name__ == "__main__":
@@ -7,17 +7,27 @@ clients previously used in the codebase.
 """
 
 import hashlib
+import itertools
 import json
 import logging
 import os
+import queue
 import random
+import re
+import threading
 import time
 import uuid
-from typing import Any, Dict, List, Optional
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
 import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+from common.token_bucket import TokenBucket
+from vector_service.embedding_cache import EmbeddingCache, get_embedding_cache
 
 # Optional Pinecone import - using v6.x API
 try:
@@ -28,14 +38,202 @@ except ImportError:
     PINECONE_AVAILABLE = False
     logging.warning("⚠️ Pinecone not available - vector search will be disabled")
 
+# Optional gRPC transport (pinecone[grpc]) - lower overhead upserts/queries, REST otherwise
+try:
+    from pinecone.grpc import PineconeGRPC
+
+    PINECONE_GRPC_AVAILABLE = True
+except ImportError:
+    PINECONE_GRPC_AVAILABLE = False
+
+# orjson encodes requests and parses embedding responses (thousands of floats) several
+# times faster; fall back to stdlib json
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    _json_loads = json.loads
+
 # Load environment variables from .env file
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Env flag values treated as "on"
+_TRUE_VALUES = frozenset({"1", "true", "yes"})
+
+# Environment configuration, resolved once per process and shared by all clients
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+PINECONE_PRODUCTS_INDEX = os.getenv("PINECONE_PRODUCTS_INDEX", "chatbot-products")
+PINECONE_SUPPORT_INDEX = os.getenv("PINECONE_SUPPORT_INDEX", "chatbot-support-knowledge")
+# gRPC transport is used when pinecone[grpc] is installed unless explicitly turned off
+PINECONE_USE_GRPC = os.getenv("PINECONE_USE_GRPC", "true").lower() in _TRUE_VALUES
+HF_API_KEY = os.getenv("HF_API_KEY")
+HF_PRODUCT_MODEL = os.getenv("HF_PRODUCT_MODEL", "BAAI/bge-small-en-v1.5")
+HF_SUPPORT_MODEL = os.getenv("HF_SUPPORT_MODEL", "BAAI/bge-small-en-v1.5")
+
+# Pinecone caps upsert throughput at 50 MB/s per namespace; stay safely below it
+UPSERT_RATE_BYTES_PER_SEC = 40_000_000
+UPSERT_BURST_BYTES = 80_000_000
+UPSERT_MAX_RETRIES = 5
+# Upper bound on one embedding value's size in a JSON request (float repr plus separator)
+UPSERT_BYTES_PER_VALUE = 24
+# REST upserts send values as JSON text: rounding to this many decimals roughly halves
+# the payload (gRPC already sends packed float32, so it is left untouched)
+REST_UPSERT_VALUE_DECIMALS = 6
+
+# How long describe_index_stats results are reused before asking Pinecone again
+INDEX_STATS_TTL_SECONDS = 30
+
+# How long identical searches are answered from Redis (0 disables the query cache)
+QUERY_CACHE_TTL_SECONDS = int(os.getenv("QUERY_CACHE_TTL_SECONDS", "60"))
+
+# Pinecone limits metadata by bytes (40 KB per vector); budget for support doc content
+SUPPORT_CONTENT_MAX_BYTES = 4000
+
+# Runs of characters not allowed in tag metadata keys (underscores included, so runs collapse)
+_TAG_NONALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# Shared keep-alive session for Hugging Face calls: both clients hit the same host, so one
+# connection pool serves them. The adapter never retries - callers run their own retry loops.
+_HF_SESSION = requests.Session()
+_HF_SESSION.headers["Connection"] = "keep-alive"
+_HF_SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0))
+
+# Max concurrent Hugging Face batch requests per process. The limit is shared by every
+# caller (e.g. all product indexing workers), so it holds no matter how many batches run
+EMBED_CONCURRENCY = max(1, int(os.getenv("HF_EMBED_CONCURRENCY", "8")))
+_EMBED_SLOTS = threading.BoundedSemaphore(EMBED_CONCURRENCY)
+
+# Product indexing concurrency: worker threads and max batches held in memory at once
+INDEX_MAX_WORKERS = 8
+INDEX_MAX_IN_FLIGHT_BATCHES = 16
+
+# Filtered clear_index on large indexes: matching ids are found with id-only queries (up to
+# Pinecone's top_k limit per round) and deleted by id concurrently, so no single request
+# has to scan the whole index
+CLEAR_INDEX_PAGED_MIN_VECTORS = 10_000
+CLEAR_INDEX_QUERY_TOP_K = 10_000
+CLEAR_INDEX_PAGE_SIZE = 1000
+CLEAR_INDEX_MAX_WORKERS = 8
+
+# Redis (optional) shared by every client in the process: one connection pool serves
+# embedding usage tracking and the query cache. Created on first use.
+_shared_redis = None
+_shared_redis_initialized = False
+_shared_redis_lock = threading.Lock()
+# Embedding usage increments, flushed to Redis by one background thread so embedding
+# calls never wait on Redis
+_usage_queue: "queue.Queue[int]" = queue.Queue()
+
+
+def get_shared_redis():
+    """Return the process-wide Redis client (None if REDIS_URL is unset or unusable)"""
+    global _shared_redis, _shared_redis_initialized
+    if _shared_redis_initialized:
+        return _shared_redis
+
+    with _shared_redis_lock:
+        if not _shared_redis_initialized:
+            redis_url = os.getenv("REDIS_URL")
+            if redis_url:
+                try:
+                    import redis
+
+                    # Short timeouts: the query cache sits on the search path
+                    _shared_redis = redis.from_url(
+                        redis_url,
+                        decode_responses=True,
+                        socket_timeout=2,
+                        socket_connect_timeout=2,
+                    )
+                    threading.Thread(
+                        target=_flush_embedding_usage,
+                        args=(_shared_redis,),
+                        name="embedding-usage",
+                        daemon=True,
+                    ).start()
+                except Exception as e:
+                    logger.warning(f"Redis unavailable for usage tracking and query cache: {e}")
+            _shared_redis_initialized = True
+    return _shared_redis
+
+
+def _flush_embedding_usage(redis_client) -> None:
+    """Background loop: coalesce queued counts and write them in one pipeline round trip"""
+    while True:
+        count = _usage_queue.get()
+        while True:
+            try:
+                count += _usage_queue.get_nowait()
+            except queue.Empty:
+                break
+
+        try:
+            key = f"monthly_embeddings:{datetime.now().strftime('%Y-%m')}"
+            pipeline = redis_client.pipeline(transaction=False)
+            pipeline.incrby(key, count)
+            pipeline.expire(key, 2678400)  # 31 days
+            pipeline.execute()
+        except Exception as e:
+            logger.debug("Embedding usage tracking failed: %s", e)  # Never affects embedding
+
+
+def chunks(iterable: Iterable[Any], batch_size: int = 100) -> Iterator[List[Any]]:
+    """Yield successive lists of up to batch_size items from an iterable"""
+    it = iter(iterable)
+    chunk = list(itertools.islice(it, batch_size))
+    while chunk:
+        yield chunk
+        chunk = list(itertools.islice(it, batch_size))
+
+
+def unique_by_id(products: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Drop all but the last occurrence of each product id, keeping the order of the rest
+
+    The last occurrence wins, as it did when every duplicate was upserted in order.
+    Products without an id are always kept.
+    """
+    seen_ids = set()
+    unique = []
+    for product in reversed(products):
+        product_id = product.get("id")
+        if product_id is not None:
+            product_id = str(product_id)
+            if product_id in seen_ids:
+                continue
+            seen_ids.add(product_id)
+        unique.append(product)
+    unique.reverse()
+    return unique
+
+
+def truncate_utf8(text: str, max_bytes: int) -> str:
+    """Truncate text to at most max_bytes of UTF-8 without splitting a character"""
+    encoded = text.encode("utf-8")
+    if len(encoded) <= max_bytes:
+        return text
+    return encoded[:max_bytes].decode("utf-8", "ignore")
+
+
+class FallbackEmbedding(list):
+    """A locally generated placeholder vector (serializes like any list of floats)
+
+    The type lets indexers tell placeholders apart from real API embeddings.
+    """
+
 
 class PineconeClient:
     """Unified Pinecone client for both product search and support document RAG"""
 
+    # Base filter for product searches (copied per query, never mutated)
+    _BASE_PRODUCT_FILTER = {"type": "product"}
+
     def __init__(
         self,
         api_key: str = None,
@@ -44,6 +242,8 @@ class PineconeClient:
         dimension: int = 384,
         hf_model: str = None,
         index_type: str = "products",
+        batch_size: int = 64,
+        pool_threads: int = 30,
     ):
         """
         Initialize Pinecone client
@@ -55,8 +255,10 @@ class PineconeClient:
             dimension: Dimension of embeddings (defaults to 384 for BAAI/bge-small-en-v1.5)
             hf_model: HuggingFace model to use for embeddings
             index_type: Type of index ("products" or "support")
+            batch_size: Number of vectors per upsert request
+            pool_threads: Number of threads used for parallel upsert requests
         """
-        self.api_key = api_key or os.getenv("PINECONE_API_KEY")
+        self.api_key = api_key or PINECONE_API_KEY
         self.environment = environment
         self.index_type = index_type
 
@@ -64,30 +266,71 @@ class PineconeClient:
         if index_name:
             self.index_name = index_name
         elif index_type == "products":
-            self.index_name = os.getenv("PINECONE_PRODUCTS_INDEX", "chatbot-products")
+            self.index_name = PINECONE_PRODUCTS_INDEX
         else:  # support
-            self.index_name = os.getenv("PINECONE_SUPPORT_INDEX", "chatbot-support-knowledge")
+            self.index_name = PINECONE_SUPPORT_INDEX
 
         self.dimension = dimension
+        self.batch_size = batch_size
+        self.pool_threads = pool_threads
+        self._upsert_bucket = TokenBucket(
+            rate=UPSERT_RATE_BYTES_PER_SEC, capacity=UPSERT_BURST_BYTES
+        )
 
         # Initialize Hugging Face API
-        self.hf_api_key = os.getenv("HF_API_KEY")
+        self.hf_api_key = HF_API_KEY
 
         # Set default model based on type if not provided
         if hf_model:
             self.hf_model = hf_model
         elif index_type == "products":
-            self.hf_model = os.getenv("HF_PRODUCT_MODEL", "BAAI/bge-small-en-v1.5")
+            self.hf_model = HF_PRODUCT_MODEL
         else:  # support
-            self.hf_model = os.getenv("HF_SUPPORT_MODEL", "BAAI/bge-small-en-v1.5")
+            self.hf_model = HF_SUPPORT_MODEL
 
         # Use direct models API for feature extraction
         self.hf_api_url = f"https://api-inference.huggingface.co/models/{self.hf_model}"
 
+        # Without an API key every request would just fail with 401 before falling back:
+        # choose the local fallback path once here instead of per call
+        if not self.hf_api_key:
+            logger.warning("⚠️ HF_API_KEY not set - using fallback embeddings (no semantic search)")
+            self._get_embeddings = self._get_fallback_embeddings
+
+        # Reused HTTP session: keep-alive connections avoid a TLS handshake per embedding call
+        self._http = _HF_SESSION
+        # Bodies are pre-encoded with _json_dumps, so the content type is set explicitly
+        self._hf_headers = {
+            "Authorization": f"Bearer {self.hf_api_key}",
+            "Content-Type": "application/json",
+        }
+
+        # Search feature flags, parsed once rather than on every query
+        self.search_case_insensitive = (
+            os.getenv("SEARCH_CASE_INSENSITIVE", "false").lower() in _TRUE_VALUES
+        )
+        # Server-side tags filter gated until products are reindexed with tag flags
+        self.search_tags_server_filter = (
+            os.getenv("SEARCH_TAGS_SERVER_FILTER_ENABLED", "false").lower() in _TRUE_VALUES
+        )
+
+        # Persistent cache of API embeddings keyed by content hash
+        self.embedding_cache = get_embedding_cache()
+        # Cache keys currently being embedded by some thread -> Future of the vector
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+        # Redis (optional) for embedding usage tracking and the short-lived query cache
+        self._redis = get_shared_redis()
+
         # Initialize Pinecone
         self.pc = None
         self.index = None
+        self.use_grpc = False
         self.available = False
+        self._stats_cache = None
+        self._stats_cache_time = 0.0
+        self._stats_lock = threading.Lock()
         self._initialize_pinecone()
 
     def _initialize_pinecone(self):
@@ -101,17 +344,36 @@ class PineconeClient:
                 logger.warning("⚠️ PINECONE_API_KEY not found. Vector search will be disabled.")
                 return
 
-            # Initialize Pinecone with v6.x API
-            self.pc = Pinecone(api_key=self.api_key)
+            # Initialize Pinecone with v6.x API, preferring the gRPC transport
+            use_grpc = self.use_grpc = PINECONE_GRPC_AVAILABLE and PINECONE_USE_GRPC
+            if use_grpc:
+                self.pc = PineconeGRPC(api_key=self.api_key)
+            else:
+                self.pc = Pinecone(api_key=self.api_key)
 
             # Connect to existing serverless index
             try:
-                # Connect to the index
-                self.index = self.pc.Index(self.index_name)
+                # Connect to the index (REST needs a thread pool for async upserts)
+                if use_grpc:
+                    self.index = self.pc.Index(self.index_name)
+                else:
+                    self.index = self.pc.Index(self.index_name, pool_threads=self.pool_threads)
                 # Test the connection
-                stats = self.index.describe_index_stats()
-                logger.info(f"✅ Connected to Pinecone serverless index: {self.index_name}")
+                stats = self._get_index_stats()
+                transport = "gRPC" if use_grpc else "REST"
+                logger.info(
+                    f"✅ Connected to Pinecone serverless index: {self.index_name} ({transport})"
+                )
                 logger.info(f"📊 Index has {stats.total_vector_count} vectors")
+                # Validate embeddings (and size fallbacks) against the index itself, so a
+                # misconfigured dimension can't drift from what Pinecone will accept
+                index_dimension = getattr(stats, "dimension", None)
+                if index_dimension and index_dimension != self.dimension:
+                    logger.warning(
+                        f"⚠️ Index {self.index_name} has dimension {index_dimension}, "
+                        f"not the configured {self.dimension} - using the index dimension"
+                    )
+                    self.dimension = index_dimension
                 self.available = True
             except Exception as connect_error:
                 logger.warning(
@@ -131,8 +393,55 @@ class PineconeClient:
         """Check if Pinecone is available"""
         return self.available and self.index is not None
 
+    def _get_index_stats(self):
+        """Return describe_index_stats(), reusing a result younger than INDEX_STATS_TTL_SECONDS
+
+        Only one thread refreshes an expired result; concurrent callers (e.g. a burst of
+        health checks) wait for it instead of each querying Pinecone.
+        """
+        stats = self._stats_cache
+        if (
+            stats is not None
+            and time.monotonic() - self._stats_cache_time < INDEX_STATS_TTL_SECONDS
+        ):
+            return stats
+
+        with self._stats_lock:
+            # Another thread may have refreshed while we waited for the lock
+            stats = self._stats_cache
+            if (
+                stats is None
+                or time.monotonic() - self._stats_cache_time >= INDEX_STATS_TTL_SECONDS
+            ):
+                stats = self.index.describe_index_stats()
+                self._stats_cache = stats
+                self._stats_cache_time = time.monotonic()
+            return stats
+
+    def _invalidate_index_stats(self) -> None:
+        """Drop cached index stats and cached searches after the index contents change"""
+        self._stats_cache = None
+        # New generation: search results cached before the change are no longer looked up
+        if self._redis is not None and QUERY_CACHE_TTL_SECONDS > 0:
+            try:
+                self._redis.incr(f"qgen:{self.index_name}")
+            except Exception as e:
+                logger.debug("Query cache invalidation failed: %s", e)
+
     def _get_embedding(self, text: str) -> List[float]:
-        """Get embedding from Hugging Face API with retries and fallback"""
+        """Get the embedding for a search query (cached, shared with concurrent callers, with fallback)
+
+        Query embeddings are not persisted to the SQLite cache tier: unique user queries
+        would otherwise accumulate on disk.
+        """
+        return self._get_embeddings([text], persist=False)[0]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query the same way searches do, e.g. to pass as query_embedding later"""
+        return self._get_embedding(text)
+
+    def _embed_text(self, text: str, persist: bool = True) -> List[float]:
+        """Get one embedding from Hugging Face API with retries and fallback (no cache lookup)"""
         # Configuration for retries
         max_retries = 3
         retry_delay = 2  # seconds
@@ -143,235 +452,664 @@ class PineconeClient:
             try:
                 # Log retry attempts if not the first try
                 if attempt > 1:
-                    logger.info(f"Retry attempt {attempt}/{max_retries} for embedding generation")
+                    logger.info("Retry attempt %d/%d for embedding generation", attempt, max_retries)
                 
                 # Try to get embedding from Hugging Face API
-                headers = {"Authorization": f"Bearer {self.hf_api_key}"}
                 current_timeout = timeout * attempt  # Increase timeout with each retry
                 
-                logger.debug(f"Requesting embedding with timeout={current_timeout}s")
-                response = requests.post(
+                logger.debug("Requesting embedding with timeout=%ds", current_timeout)
+                response = self._http.post(
                     self.hf_api_url,
-                    headers=headers,
-                    json={"inputs": [text]},  # Correct format: array of strings
+                    data=_json_dumps({"inputs": [text]}),  # Correct format: array of strings
+                    headers=self._hf_headers,
                     timeout=current_timeout,
                 )
 
                 if response.status_code == 200:
-                    embeddings = response.json()
+                    embeddings = _json_loads(response.content)
+                    if (
+                        isinstance(embeddings, list)
+                        and len(embeddings) > 0
+                        and not self._valid_embedding(embeddings[0])
+                    ):
+                        # Wrong model for this index: retrying can't help, and Pinecone
+                        # would reject the vector after a full round trip
+                        logger.warning(
+                            "Embedding model %s does not return %d-dim vectors, using fallback",
+                            self.hf_model,
+                            self.dimension,
+                        )
+                        break
                     if isinstance(embeddings, list) and len(embeddings) > 0:
                         # Track embedding usage for free tier monitoring
-                        try:
-                            import os
-                            from datetime import datetime
-
-                            import redis
-
-                            redis_url = os.getenv("REDIS_URL")
-                            if redis_url:
-                                redis_client = redis.from_url(redis_url, decode_responses=True)
-                                this_month = datetime.now().strftime("%Y-%m")
-                                redis_client.incr(f"monthly_embeddings:{this_month}")
-                                redis_client.expire(
-                                    f"monthly_embeddings:{this_month}", 2678400
-                                )  # 31 days
-                        except Exception:
-                            pass  # Don't fail embedding if tracking fails
+                        self._track_embedding_usage()
 
                         logger.debug("Successfully generated embedding")
+                        self.embedding_cache.set_many(
+                            {EmbeddingCache.make_key(self.hf_model, text): embeddings[0]},
+                            persist=persist,
+                        )
                         return embeddings[0]  # First (and only) embedding
                     else:
-                        logger.warning(f"Unexpected embedding format: {embeddings}")
+                        logger.warning("Unexpected embedding format: %s", embeddings)
                 else:
-                    logger.warning(f"Failed to get embedding from API: {response.text}")
-                    
+                    # response.text decodes the body, so only read it if it will be logged
+                    if logger.isEnabledFor(logging.WARNING):
+                        logger.warning("Failed to get embedding from API: %s", response.text)
+            
                     # Don't retry on 4xx errors (client errors)
                     if 400 <= response.status_code < 500:
                         break
-            
+                    
             except requests.exceptions.Timeout:
-                logger.warning(f"Timeout getting embedding (attempt {attempt}/{max_retries})")
+                logger.warning("Timeout getting embedding (attempt %d/%d)", attempt, max_retries)
             except Exception as e:
-                logger.warning(f"Error getting embedding from API for text '{text[:30]}...' (attempt {attempt}/{max_retries}): {e}", exc_info=True)
-            
+                logger.warning(
+                    "Error getting embedding from API for text '%s...' (attempt %d/%d): %s",
+                    text[:30],
+                    attempt,
+                    max_retries,
+                    e,
+                    exc_info=True,
+                )
+
             # Wait before retrying, but not on the last attempt
             if attempt < max_retries:
                 time.sleep(retry_delay * attempt)  # Exponential backoff
-        
+            
         # If we get here, all retries failed
         # Generate a simple deterministic embedding as fallback
         logger.warning("All embedding API attempts failed, using fallback")
         return self._generate_fallback_embedding(text)
+        
+    def _get_embeddings(
+        self, texts: List[str], batch_size: int = 32, persist: bool = True
+    ) -> List[List[float]]:
+        """Get embeddings for many texts, sending them to Hugging Face in batches.
+
+        Identical texts are embedded once and the vector is shared by every occurrence.
+        Cached embeddings are reused and only cache misses are sent to the API. A miss
+        that another thread is already embedding (e.g. a concurrent indexing batch with
+        the same templated text) waits for that result instead of being sent again.
+        Each batch is retried once; if it still fails, its texts are embedded one by one
+        via _embed_text (with its own retries and fallback). A lone miss (e.g. a search
+        query) goes straight to _embed_text. Results keep input order. persist=False
+        keeps new embeddings out of the on-disk cache tier.
+        """
+        keys = [EmbeddingCache.make_key(self.hf_model, text) for text in texts]
+        unique_texts = dict(zip(keys, texts))
+        if len(unique_texts) < len(texts):
+            logger.debug("Embedding %d unique texts for %d inputs", len(unique_texts), len(texts))
+
+        cached: Dict[str, List[float]] = {}
+        for key_chunk in chunks(unique_texts, 500):
+            cached.update(self.embedding_cache.get_many(key_chunk))
+        if cached:
+            logger.debug("Embedding cache hits: %d/%d", len(cached), len(unique_texts))
+
+        # Claim the misses nobody else is embedding; wait on the rest afterwards
+        misses = []
+        pending: Dict[str, Future] = {}
+        with self._inflight_lock:
+            for key, text in unique_texts.items():
+                if key in cached:
+                    continue
+                if key in self._inflight:
+                    pending[key] = self._inflight[key]
+                else:
+                    self._inflight[key] = Future()
+                    misses.append((key, text))
+
+        try:
+            if len(misses) == 1:
+                # Single text: the per-text path already retries and caches on success
+                key, text = misses[0]
+                cached[key] = self._embed_text(text, persist)
+                miss_batches = []
+            else:
+                miss_batches = list(chunks(misses, batch_size))
+            batch_results = self._post_embedding_batches(
+                [[text for _, text in batch] for batch in miss_batches]
+            )
+
+            for batch, batch_embeddings in zip(miss_batches, batch_results):
+                batch_keys = [key for key, _ in batch]
+                if batch_embeddings is None:
+                    logger.warning(
+                        f"Batch embedding failed, embedding {len(batch)} texts individually"
+                    )
+                    batch_embeddings = [self._embed_text(text, persist) for _, text in batch]
+                elif not all(self._valid_embedding(vector) for vector in batch_embeddings):
+                    # Deterministic misconfiguration: don't retry text by text or cache them
+                    logger.warning(
+                        f"Embedding model {self.hf_model} does not return {self.dimension}-dim "
+                        f"vectors, using fallback for {len(batch)} texts"
+                    )
+                    batch_embeddings = [
+                        self._generate_fallback_embedding(text) for _, text in batch
+                    ]
+                else:
+                    self._track_embedding_usage(len(batch))
+                    self.embedding_cache.set_many(
+                        dict(zip(batch_keys, batch_embeddings)), persist=persist
+                    )
+
+                cached.update(zip(batch_keys, batch_embeddings))
+        finally:
+            # Publish results (or the failure) to any thread waiting on these texts
+            with self._inflight_lock:
+                for key, _ in misses:
+                    future = self._inflight.pop(key)
+                    if key in cached:
+                        future.set_result(cached[key])
+                    else:
+                        future.set_exception(RuntimeError("Embedding request failed"))
+
+        for key, future in pending.items():
+            cached[key] = future.result()
+
+        return [cached[key] for key in keys]
 
-    def _generate_fallback_embedding(self, text: str) -> List[float]:
+    def _valid_embedding(self, vector: Any) -> bool:
+        """Check an API embedding has the index dimension (Pinecone rejects anything else)"""
+        return isinstance(vector, list) and len(vector) == self.dimension
+
+    def _get_fallback_embeddings(
+        self, texts: List[str], batch_size: int = 32, persist: bool = True
+    ) -> List[FallbackEmbedding]:
+        """_get_embeddings for clients without an API key: local fallback vectors only"""
+        return [self._generate_fallback_embedding(text) for text in texts]
+
+    def _post_embedding_batches(
+        self, batches: List[List[str]]
+    ) -> List[Optional[List[List[float]]]]:
+        """Send text batches to Hugging Face, returning embeddings per batch (None on failure)
+
+        Batches are sent concurrently from a thread pool, at most EMBED_CONCURRENCY at a
+        time across the whole process (see _post_embedding_batch). Requests share the
+        keep-alive _HF_SESSION pool, so connections stay open across calls (e.g.
+        successive product indexing batches) instead of being re-established.
+        Each batch keeps its own retry loop, so one failure doesn't affect the others.
+        """
+        if not batches:
+            return []
+        if len(batches) == 1:
+            return [self._post_embedding_batch(batches[0])]
+        with ThreadPoolExecutor(max_workers=min(EMBED_CONCURRENCY, len(batches))) as executor:
+            return list(executor.map(self._post_embedding_batch, batches))
+
+    def _post_embedding_batch(self, batch: List[str]) -> Optional[List[List[float]]]:
+        """POST one batch of texts to Hugging Face, retrying once
+
+        Each request holds one of the process-wide _EMBED_SLOTS, so concurrent indexing
+        workers together never exceed EMBED_CONCURRENCY requests. The slot is released
+        before the retry delay.
+        """
+        max_attempts = 2
+        timeout = 15  # seconds
+
+        for attempt in range(1, max_attempts + 1):
+            try:
+                with _EMBED_SLOTS:
+                    response = self._http.post(
+                        self.hf_api_url,
+                        data=_json_dumps({"inputs": batch}),
+                        headers=self._hf_headers,
+                        timeout=timeout * attempt,
+                    )
+                if response.status_code == 200:
+                    result = _json_loads(response.content)
+                    if isinstance(result, list) and len(result) == len(batch):
+                        return result
+                    logger.warning("Unexpected batch embedding format for %d texts", len(batch))
+                elif logger.isEnabledFor(logging.WARNING):
+                    logger.warning("Failed to get batch embeddings from API: %s", response.text)
+            except Exception as e:
+                logger.warning(
+                    "Error getting batch embeddings (attempt %d/%d): %s", attempt, max_attempts, e
+                )
+            if attempt < max_attempts:
+                time.sleep(attempt)
+        return None
+
+    def _query_cache_key(self, *parts: Any) -> Optional[str]:
+        """Redis key for a search's results, or None when the query cache is off
+
+        Keyed by index and model so product and support results (or results from a
+        different embedding model) never collide, and by the index generation, which
+        _invalidate_index_stats bumps whenever the index contents change (in any process).
+        """
+        if self._redis is None or QUERY_CACHE_TTL_SECONDS <= 0:
+            return None
+        try:
+            generation = self._redis.get(f"qgen:{self.index_name}") or "0"
+        except Exception as e:
+            logger.debug("Query cache generation read failed: %s", e)
+            return None
+        digest = hashlib.sha1(
+            json.dumps([self.hf_model, generation, *parts], sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"q:{self.index_name}:{digest}"
+
+    def _get_cached_query(self, key: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+        """Return cached search results for key, or None on a miss or Redis error"""
+        if key is None:
+            return None
+        try:
+            cached = self._redis.get(key)
+            return json.loads(cached) if cached is not None else None
+        except Exception as e:
+            logger.debug("Query cache read failed: %s", e)
+            return None
+
+    def _set_cached_query(self, key: Optional[str], results: List[Dict[str, Any]]) -> None:
+        """Store search results under key for QUERY_CACHE_TTL_SECONDS (errors are ignored)"""
+        if key is None:
+            return
+        try:
+            self._redis.setex(key, QUERY_CACHE_TTL_SECONDS, json.dumps(results))
+        except Exception as e:
+            logger.debug("Query cache write failed: %s", e)
+
+    def _track_embedding_usage(self, count: int = 1) -> None:
+        """Count generated embeddings in Redis for free tier monitoring (non-blocking)"""
+        if self._redis is not None:
+            _usage_queue.put_nowait(count)
+
+    def _generate_fallback_embedding(self, text: str) -> FallbackEmbedding:
         """Generate a simple deterministic embedding when HuggingFace API fails"""
-        logger.info("Using fallback embedding generation")
+        logger.debug("Using fallback embedding generation")  # Callers already warn
 
         # Create a simple deterministic embedding based on text characteristics
         # This is not semantically meaningful but provides a consistent vector for the same text
 
-        # Create a hash of the text
-        text_hash = hashlib.md5(text.encode()).digest()
+        # Create a 64-bit hash of the text (blake2b: cheaper than MD5 and FIPS-safe;
+        # the builtin hash() would not do, it is randomized per process)
+        text_hash = hashlib.blake2b(text.encode(), digest_size=8).digest()
 
-        # Use the hash to seed a random number generator
-        np.random.seed(int.from_bytes(text_hash[:4], byteorder="big"))
+        # Use the hash to seed a local generator (never touch the global np.random state,
+        # which other threads may be using)
+        rng = np.random.default_rng(int.from_bytes(text_hash, byteorder="big"))
 
         # Generate a random embedding vector of the correct dimension
-        embedding = np.random.uniform(-1, 1, self.dimension).tolist()
+        embedding = rng.uniform(-1, 1, self.dimension).astype(np.float32)
 
-        # Normalize to unit length for cosine similarity
-        norm = sum(x * x for x in embedding) ** 0.5
-        if norm > 0:
-            embedding = [x / norm for x in embedding]
+        # Normalize to unit length for cosine similarity, in place; .tolist() is the
+        # only pass that creates Python floats
+        embedding /= np.linalg.norm(embedding) or 1.0
 
-        return embedding
+        return FallbackEmbedding(embedding.tolist())
 
     def _normalize_tag(self, tag) -> str:
         """Normalize a tag string to a safe metadata key suffix.
         Rules: lowercase, trim, non-alnum -> underscore, collapse repeats, strip edges.
         """
-        try:
-            s = str(tag).strip().lower()
-            s = re.sub(r"[^a-z0-9]+", "_", s)
-            s = re.sub(r"_+", "_", s).strip("_")
-            return s
-        except Exception:
-            return ""
+        return _TAG_NONALNUM_RE.sub("_", str(tag).strip().lower()).strip("_")
 
     # ===== Product-specific methods =====
 
-    def index_products(self, products: List[Dict[str, Any]]) -> bool:
+    def index_products(self, products: Iterable[Dict[str, Any]]) -> bool:
         """Index products with embeddings for vector search"""
         if not self.is_available():
             logger.warning("Pinecone not available")
             return False
 
         try:
-            vectors_to_upsert = []
-            successful = 0
+            successful = self.index_products_batched(products)
+            logger.info(f"✅ Indexed {successful} products to Pinecone")
+            return True
 
-            for product in products:
-                # Create searchable text combining title, description, category
-                searchable_text = f"{product.get('title', '')} {product.get('description', '')} {product.get('category', '')}"
+        except Exception as e:
+            logger.error(f"❌ Failed to index products: {e}")
+            return False
 
-                # Generate embedding using Hugging Face API
-                embedding = self._get_embedding(searchable_text)
-                if not embedding:
-                    logger.warning(
-                        f"Skipping product {product.get('id')} - failed to generate embedding"
+    def index_products_batched(
+        self,
+        products: Iterable[Dict[str, Any]],
+        batch_size: int = 100,
+        max_workers: int = INDEX_MAX_WORKERS,
+        wait_for: Optional[Future] = None,
+        skip_unchanged: bool = True,
+    ) -> int:
+        """Embed and upsert products batch by batch from any iterable (e.g. a stream).
+
+        Batches are embedded and upserted on a thread pool so embedding calls and
+        Pinecone round trips overlap. A bounded semaphore caps the number of batches in
+        flight, so memory stays bounded even for a large stream; batches of 100 keep
+        each upsert under Pinecone's request size limit. Returns the number of products
+        indexed and raises on the first failed batch, cancelling batches not yet started.
+        Duplicate product ids within a batch are embedded once (the last occurrence wins).
+        A batch repeating an id from an earlier batch waits for that batch to finish, so
+        the later record is upserted last and wins as well.
+
+        If wait_for is given (e.g. a pending clear_index call), batches are embedded
+        while it runs but no upsert is sent until it completes; a falsy result aborts.
+
+        With skip_unchanged, products whose stored content_hash matches their current
+        data are not re-embedded; they still count towards the returned total. Pass
+        skip_unchanged=False after clearing the index, when nothing can match.
+        """
+        in_flight = threading.BoundedSemaphore(INDEX_MAX_IN_FLIGHT_BATCHES)
+        failed = threading.Event()
+        futures = []
+
+        def index_batch(batch: List[Dict[str, Any]], earlier: List[Future]) -> int:
+            try:
+                # Earlier batches holding the same ids must land first
+                for future in earlier:
+                    future.result()
+                if skip_unchanged:
+                    changed, content_hashes = self._filter_unchanged_products(batch)
+                else:
+                    changed, content_hashes = batch, None
+                vectors_to_upsert = self._build_product_vectors(changed, content_hashes)
+                if wait_for is not None and not wait_for.result():
+                    raise RuntimeError("Prerequisite for product upserts failed")
+                if vectors_to_upsert:
+                    self._upsert_parallel(vectors_to_upsert)
+                return len(vectors_to_upsert) + len(batch) - len(changed)
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                in_flight.release()
+
+        # Latest batch future per product id. Only ids are remembered, so streams stay lazy
+        batch_by_id: Dict[str, Future] = {}
+        duplicates = 0
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for batch in chunks(products, batch_size):
+                    unique = unique_by_id(batch)
+                    ids = [
+                        str(product["id"]) for product in unique if product.get("id") is not None
+                    ]
+                    repeated = [
+                        batch_by_id[product_id] for product_id in ids if product_id in batch_by_id
+                    ]
+                    duplicates += len(batch) - len(unique) + len(repeated)
+
+                    in_flight.acquire()
+                    if failed.is_set():
+                        in_flight.release()
+                        break
+                    future = executor.submit(index_batch, unique, list(dict.fromkeys(repeated)))
+                    futures.append(future)
+                    for product_id in ids:
+                        batch_by_id[product_id] = future
+
+                if duplicates:
+                    logger.info(
+                        "Found %d duplicate product ids; the last occurrence of each is kept",
+                        duplicates,
                     )
-                    continue
 
-                # Derive values needed for metadata
-                stock_value = int(product.get("stock", 0))
-                availability_status = "in_stock" if stock_value > 0 else "out_of_stock"
-                sku_value = (
-                    str(product.get("sku"))
-                    if product.get("sku") is not None
-                    else str(product.get("id", ""))
-                )
+                wait(futures, return_when=FIRST_EXCEPTION)
+                if failed.is_set():
+                    for future in futures:
+                        future.cancel()
+                    for future in futures:
+                        if future.done() and not future.cancelled() and future.exception():
+                            raise future.exception()
+
+            return sum(future.result() for future in futures)
+        finally:
+            self._invalidate_index_stats()
+
+    def _product_content_hash(self, product: Dict[str, Any]) -> str:
+        """Stable hash of a product's source data and the embedding model used for it"""
+        payload = json.dumps(product, sort_keys=True, default=str) + "\x1f" + self.hf_model
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _filter_unchanged_products(
+        self, products: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[str]]]:
+        """Drop products whose indexed content_hash matches their current data
+
+        Records stored with a fallback vector are never dropped, so they get a real
+        embedding once the API is reachable again. Returns the changed products and
+        their content hashes (None if none were computed), so building their vectors
+        doesn't hash them a second time.
+        """
+        ids = [str(product["id"]) for product in products if product.get("id") is not None]
+        if not ids:
+            return products, None
+
+        try:
+            existing = self.index.fetch(ids=ids).vectors
+        except Exception as e:
+            logger.warning(f"Could not fetch existing product hashes, reindexing batch: {e}")
+            return products, None
+
+        changed = []
+        changed_hashes = []
+        reusable: Dict[str, List[float]] = {}
+        for product in products:
+            content_hash = self._product_content_hash(product)
+            record = existing.get(str(product.get("id")))
+            metadata = record.metadata if record and record.metadata else {}
+            stored_hash = metadata.get("content_hash")
+            # Only records stored with a real embedding carry text_hash. Older records may
+            # hold a content_hash over a fallback vector; re-embed those instead of
+            # skipping them on every run
+            if stored_hash != content_hash or not metadata.get("text_hash"):
+                changed.append(product)
+                changed_hashes.append(content_hash)
+
+                # Only non-text fields changed (price, stock...): the fetched vector is still
+                # valid, so seed the embedding cache with it instead of calling the API again
+                if metadata.get("text_hash") and record.values:
+                    cache_key = EmbeddingCache.make_key(
+                        self.hf_model, self._product_searchable_text(product)
+                    )
+                    if metadata["text_hash"] == cache_key[:16]:
+                        reusable[cache_key] = list(record.values)
+
+        if len(changed) < len(products):
+            logger.debug("Skipping %d unchanged products", len(products) - len(changed))
+        if reusable:
+            logger.debug("Reusing %d stored embeddings with unchanged text", len(reusable))
+            self.embedding_cache.set_many(reusable)
+        return changed, changed_hashes
+
+    @staticmethod
+    def _product_searchable_text(product: Dict[str, Any]) -> str:
+        """Text embedded for a product: title, description and category"""
+        return f"{product.get('title', '')} {product.get('description', '')} {product.get('category', '')}"
+
+    def _build_product_vectors(
+        self, products: List[Dict[str, Any]], content_hashes: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Build Pinecone vector records (embedding + metadata) for a batch of products
+
+        content_hashes, when given, are the products' precomputed _product_content_hash values.
+        """
+        vectors_to_upsert = []
+        if content_hashes is None:
+            content_hashes = [self._product_content_hash(product) for product in products]
+
+        # Create searchable text combining title, description, category
+        searchable_texts = [self._product_searchable_text(product) for product in products]
+
+        # Generate all embeddings for the batch with batched Hugging Face API requests
+        embeddings = self._get_embeddings(searchable_texts, batch_size=32)
+
+        for product, searchable_text, embedding, content_hash in zip(
+            products, searchable_texts, embeddings, content_hashes
+        ):
+            product_id = product.get("id", "")
+            if not embedding:
+                logger.warning(f"Skipping product {product_id} - failed to generate embedding")
+                continue
+
+            # Read each field once; the dict lookups add up over large catalogs
+            sku = product.get("sku")
+            thumbnail = product.get("thumbnail")
+            images = product.get("images")
+            tags = product.get("tags")
+
+            # Derive values needed for metadata
+            stock_value = int(product.get("stock", 0))
+            availability_status = "in_stock" if stock_value > 0 else "out_of_stock"
+            product_id_str = str(product_id)
+            sku_value = str(sku) if sku is not None else product_id_str
+            brand_value = product.get("brand")
+            category_value = product.get("category")
+            # Compute discount if not explicitly provided but originalPrice/price exist
+            price_val = float(product.get("price", 0))
+            original_price_val = float(product.get("originalPrice", 0))
+            explicit_discount = product.get("discountPercentage")
+            if (
+                (explicit_discount is None or float(explicit_discount) == 0.0)
+                and original_price_val > 0
+                and price_val > 0
+                and price_val < original_price_val
+            ):
+                try:
+                    computed_discount = round(
+                        100.0 * (original_price_val - price_val) / original_price_val, 2
+                    )
+                except Exception:
+                    computed_discount = 0.0
+            else:
+                try:
+                    computed_discount = (
+                        float(explicit_discount) if explicit_discount is not None else 0.0
+                    )
+                except Exception:
+                    computed_discount = 0.0
+
+            # Prepare metadata (Pinecone has size limits)
+            # We need to ensure all values are strings, numbers, or booleans for Pinecone
+            metadata = {
+                "id": product_id_str,
+                "title": (product.get("title") or "")[:1000],  # Limit string size
+                "description": (product.get("description") or "")[:1000],  # Limit string size
+                "price": price_val,
+                "rating": float(product.get("rating", 0)),
+                "searchable_text": searchable_text[:1000],  # Limit string size
+                "type": "product",  # Add type to distinguish from support docs
+                # Extended ecommerce attributes for richer filtering
+                "stock": stock_value,
+                "discountPercentage": computed_discount,
+                "originalPrice": original_price_val,
+                # Planned fields per enhancement plan 1.2
+                "availabilityStatus": availability_status,
+                "sku": sku_value,
+            }
+            # Lets later reindex runs skip products whose source data is unchanged, and
+            # reuse the stored vector when only non-text fields changed. Placeholder vectors
+            # get neither, so the next run embeds them properly.
+            if not isinstance(embedding, FallbackEmbedding):
+                metadata["content_hash"] = content_hash
+                metadata["text_hash"] = EmbeddingCache.make_key(self.hf_model, searchable_text)[:16]
+
+            # Optional fields are only stored when present: empty strings just consume
+            # Pinecone's metadata budget and upsert bandwidth (readers use .get())
+            if brand_value:
+                metadata["brand"] = brand_value
                 # Lowercased variants for case-insensitive filtering
-                brand_value = product.get("brand", "")
-                category_value = product.get("category", "")
-                brand_value_lc = str(brand_value).lower() if brand_value is not None else ""
-                category_value_lc = (
-                    str(category_value).lower() if category_value is not None else ""
-                )
-                # Compute discount if not explicitly provided but originalPrice/price exist
-                price_val = float(product.get("price", 0))
-                original_price_val = float(product.get("originalPrice", 0))
-                explicit_discount = product.get("discountPercentage")
-                if (
-                    (explicit_discount is None or float(explicit_discount) == 0.0)
-                    and original_price_val > 0
-                    and price_val > 0
-                    and price_val < original_price_val
-                ):
-                    try:
-                        computed_discount = round(
-                            100.0 * (original_price_val - price_val) / original_price_val, 2
-                        )
-                    except Exception:
-                        computed_discount = 0.0
-                else:
-                    try:
-                        computed_discount = (
-                            float(explicit_discount) if explicit_discount is not None else 0.0
-                        )
-                    except Exception:
-                        computed_discount = 0.0
-
-                # Prepare metadata (Pinecone has size limits)
-                # We need to ensure all values are strings, numbers, or booleans for Pinecone
-                metadata = {
-                    "id": str(product.get("id", "")),
-                    "title": product.get("title", "")[:1000],  # Limit string size
-                    "description": product.get("description", "")[:1000],  # Limit string size
-                    "category": category_value,
-                    "category_lc": category_value_lc,
-                    "brand": brand_value,
-                    "brand_lc": brand_value_lc,
-                    "price": price_val,
-                    "rating": float(product.get("rating", 0)),
-                    "searchable_text": searchable_text[:1000],  # Limit string size
-                    "type": "product",  # Add type to distinguish from support docs
-                    # Add image fields
-                    "thumbnail": (
-                        str(product.get("thumbnail", ""))[:1000] if product.get("thumbnail") else ""
-                    ),
-                    # Store first image from images array if present
-                    "image": (
-                        str(product.get("images", [""])[0])[:1000]
-                        if product.get("images") and len(product.get("images", [])) > 0
-                        else ""
-                    ),
-                    # Extended ecommerce attributes for richer filtering
-                    "stock": stock_value,
-                    "discountPercentage": computed_discount,
-                    "originalPrice": original_price_val,
-                    # Planned fields per enhancement plan 1.2
-                    "availabilityStatus": availability_status,
-                    "sku": sku_value,
+                metadata["brand_lc"] = str(brand_value).lower()
+            if category_value:
+                metadata["category"] = category_value
+                metadata["category_lc"] = str(category_value).lower()
+            if thumbnail:
+                metadata["thumbnail"] = str(thumbnail)[:1000]
+            if images:
+                # Store first image from images array
+                metadata["image"] = str(images[0])[:1000]
+
+            # Add tags if available (convert to strings) and boolean flags for server-side filtering
+            if isinstance(tags, list):
+                tags = tags[:20]  # Limit number of tags
+                # Preserve comma-joined tags for backward compatibility
+                metadata["tags"] = ",".join(str(tag) for tag in tags)
+                # Boolean flags to enable server-side AND filtering on tags
+                for tag in tags:
+                    norm = self._normalize_tag(tag)
+                    if norm:
+                        metadata[f"tag_{norm}"] = True
+
+            # Create vector record
+            vectors_to_upsert.append(
+                {
+                    "id": product_id_str if "id" in product else str(uuid.uuid4()),
+                    "values": embedding,
+                    "metadata": metadata,
                 }
+            )
 
-                # Add tags if available (convert to strings) and boolean flags for server-side filtering
-                if "tags" in product and isinstance(product["tags"], list):
-                    # Preserve comma-joined tags for backward compatibility
-                    metadata["tags"] = ",".join(
-                        str(tag) for tag in product["tags"][:20]
-                    )  # Limit number of tags
-                    # Boolean flags to enable server-side AND filtering on tags
-                    for tag in product["tags"][:20]:
-                        norm = self._normalize_tag(tag)
-                        if norm:
-                            metadata[f"tag_{norm}"] = True
-
-                # Create vector record
-                vectors_to_upsert.append(
-                    {
-                        "id": str(product.get("id", str(uuid.uuid4()))),
-                        "values": embedding,
-                        "metadata": metadata,
-                    }
-                )
+        return vectors_to_upsert
 
-                # Batch upsert in chunks of 100 to avoid request size limits
-                if len(vectors_to_upsert) >= 100:
-                    self.index.upsert(vectors=vectors_to_upsert)
-                    successful += len(vectors_to_upsert)
-                    vectors_to_upsert = []
+    def _build_product_filter(
+        self,
+        price_min: Optional[float],
+        price_max: Optional[float],
+        brand: Optional[str],
+        category: Optional[str],
+        rating_min: Optional[float],
+        in_stock: Optional[bool],
+        discount_min: Optional[float],
+        tags: Optional[List[str]],
+    ):
+        """Build the Pinecone metadata filter for a product search
 
-            # Upsert any remaining vectors
-            if vectors_to_upsert:
-                self.index.upsert(vectors=vectors_to_upsert)
-                successful += len(vectors_to_upsert)
+        Returns (filter_dict, requested_tag_norms); the normalized tags are also needed
+        for Python post-filtering of matches.
+        """
+        # Prepare filter dict for metadata filtering
+        filter_dict = {**self._BASE_PRODUCT_FILTER}  # Only search for products
+
+        # Add price range filter if provided
+        if price_min is not None or price_max is not None:
+            price_filter = {}
+            if price_min is not None:
+                price_filter["$gte"] = float(price_min)
+            if price_max is not None:
+                price_filter["$lte"] = float(price_max)
+            filter_dict["price"] = price_filter
+
+        # Case-insensitive brand/category filtering controlled by env flag
+        ci_flag = self.search_case_insensitive
+        # Add brand filter
+        if brand:
+            if ci_flag:
+                filter_dict["brand_lc"] = str(brand).lower()
+            else:
+                filter_dict["brand"] = str(brand)
 
-            logger.info(f"✅ Indexed {successful} products to Pinecone")
-            return True
+        # Add category filter
+        if category:
+            if ci_flag:
+                filter_dict["category_lc"] = str(category).lower()
+            else:
+                filter_dict["category"] = str(category)
 
-        except Exception as e:
-            logger.error(f"❌ Failed to index products: {e}")
-            return False
+        # Rating lower bound
+        if rating_min is not None:
+            filter_dict["rating"] = {"$gte": float(rating_min)}
+
+        # In-stock filter
+        if in_stock is True:
+            filter_dict["stock"] = {"$gt": 0}
+
+        # Minimum discount percentage
+        if discount_min is not None:
+            filter_dict["discountPercentage"] = {"$gte": float(discount_min)}
+
+        # Server-side tags filter (AND semantics) gated by env flag until reindex is complete
+        # Enable with: SEARCH_TAGS_SERVER_FILTER_ENABLED=true
+        requested_tag_norms = []
+        if tags:
+            for raw_tag in tags:
+                norm = self._normalize_tag(raw_tag)
+                if norm:
+                    requested_tag_norms.append(norm)
+                    if self.search_tags_server_filter:
+                        filter_dict[f"tag_{norm}"] = True
+
+        return filter_dict, requested_tag_norms
 
     def search_products(
         self,
@@ -396,69 +1134,45 @@ class PineconeClient:
             return []
 
         try:
+            # Identical recent searches (retries, repeated suggestions) skip embedding and Pinecone
+            cache_key = self._query_cache_key(
+                "products",
+                query,
+                limit,
+                price_min,
+                price_max,
+                brand,
+                category,
+                rating_min,
+                in_stock,
+                discount_min,
+                tags,
+            )
+            cached = self._get_cached_query(cache_key)
+            if cached is not None:
+                logger.info(f"🔍 Found {len(cached)} products for query: '{query}' (cached)")
+                return cached
+
             # Generate query embedding using Hugging Face API
             query_embedding = self._get_embedding(query)
             if not query_embedding:
                 logger.error("Failed to generate query embedding")
                 return []
-
-            # Prepare filter dict for metadata filtering
-            filter_dict = {"type": "product"}  # Only search for products
-
-            # Add price range filter if provided
-            if price_min is not None or price_max is not None:
-                price_filter = {}
-                if price_min is not None:
-                    price_filter["$gte"] = float(price_min)
-                if price_max is not None:
-                    price_filter["$lte"] = float(price_max)
-                filter_dict["price"] = price_filter
-
-            # Case-insensitive brand/category filtering controlled by env flag
-            ci_flag = str(os.getenv("SEARCH_CASE_INSENSITIVE", "false")).lower() in (
-                "1",
-                "true",
-                "yes",
-            )
-            # Add brand filter
-            if brand:
-                if ci_flag:
-                    filter_dict["brand_lc"] = str(brand).lower()
-                else:
-                    filter_dict["brand"] = str(brand)
-
-            # Add category filter
-            if category:
-                if ci_flag:
-                    filter_dict["category_lc"] = str(category).lower()
-                else:
-                    filter_dict["category"] = str(category)
-
-            # Rating lower bound
-            if rating_min is not None:
-                filter_dict["rating"] = {"$gte": float(rating_min)}
-
-            # In-stock filter
-            if in_stock is True:
-                filter_dict["stock"] = {"$gt": 0}
-
-            # Minimum discount percentage
-            if discount_min is not None:
-                filter_dict["discountPercentage"] = {"$gte": float(discount_min)}
-
-            # Server-side tags filter (AND semantics) gated by env flag until reindex is complete
-            # Enable with: SEARCH_TAGS_SERVER_FILTER_ENABLED=true
-            server_side_tags_flag = str(
-                os.getenv("SEARCH_TAGS_SERVER_FILTER_ENABLED", "false")
-            ).lower() in ("1", "true", "yes")
-            requested_tag_norms = []
-            if tags:
-                for raw_tag in tags:
-                    norm = self._normalize_tag(raw_tag)
-                    if norm:
-                        requested_tag_norms.append(norm)
-                        if server_side_tags_flag:
-                            filter_dict[f"tag_{norm}"] = True
+            if isinstance(query_embedding, FallbackEmbedding):
+                # Results for a placeholder vector are arbitrary: serve them, don't cache them
+                cache_key = None
+
+            # Fast path: without filters, query with the shared base filter as-is
+            if tags or any(
+                value is not None
+                for value in (price_min, price_max, brand, category, rating_min, in_stock, discount_min)
+            ):
+                filter_dict, requested_tag_norms = self._build_product_filter(
+                    price_min, price_max, brand, category, rating_min, in_stock, discount_min, tags
+                )
+            else:
+                filter_dict, requested_tag_norms = self._BASE_PRODUCT_FILTER, []
+            server_side_tags_flag = self.search_tags_server_filter
 
             # Search Pinecone with vector and optional filters
             results = self.index.query(
@@ -467,48 +1181,41 @@ class PineconeClient:
 
             # Format results (with optional post-filtering for tags)
             products = []
-            # Decide if we still need Python post-filtering:
-            # If the server-side flag is ON and every match has all requested tag flags, we can skip post-filter.
-            # Otherwise (e.g., FakeIndex in tests), we keep the Python post-filter for correctness.
-            need_python_post_filter = False
-            if tags and requested_tag_norms:
-                if server_side_tags_flag:
-                    # Peek at matches to see if Pinecone actually enforced flags
-                    # If any match is missing any requested flag, keep Python post-filter.
-                    for m in results.matches:
-                        if not all(bool(m.metadata.get(f"tag_{n}")) for n in requested_tag_norms):
-                            need_python_post_filter = True
-                            break
-                    # If there are no matches, skip post-filter (nothing to filter)
-                else:
-                    need_python_post_filter = True
-
-            # Use normalized tag comparison for Python post-filtering to match server-side semantics
+            # Use normalized tag comparison for Python post-filtering to match server-side semantics.
+            # With the server-side flag ON, a match carrying every requested tag flag was already
+            # filtered by Pinecone; others (e.g. FakeIndex in tests, stale vectors) are checked here.
             for match in results.matches:
+                # Tags are stored comma-joined; split once for both filtering and output
+                product_tags = match.metadata.get("tags")
+                if isinstance(product_tags, str):
+                    # "" would split into [""]: a bogus empty tag, and an allocation for nothing
+                    product_tags = product_tags.split(",") if product_tags else []
+
+                # Apply tags filter (contains all requested tags) before copying metadata
+                if requested_tag_norms and not (
+                    server_side_tags_flag
+                    and all(match.metadata.get(f"tag_{n}") for n in requested_tag_norms)
+                ):
+                    product_tag_norms = {self._normalize_tag(t) for t in product_tags or ()}
+                    if not all(n in product_tag_norms for n in requested_tag_norms):
+                        continue
+
                 # Extract all metadata fields
-                product = {k: v for k, v in match.metadata.items()}
+                product = dict(match.metadata)
 
                 # Add score from vector similarity
                 product["similarity_score"] = float(match.score)
 
                 # Convert tags back to list if present
-                if "tags" in product and isinstance(product["tags"], str):
-                    product["tags"] = product["tags"].split(",")
-
-                # Apply tags filter (contains all requested tags)
-                if need_python_post_filter and requested_tag_norms:
-                    product_tags = product.get("tags", [])
-                    if isinstance(product_tags, str):
-                        product_tags = product_tags.split(",")
-                    product_tag_norms = [self._normalize_tag(t) for t in product_tags]
-                    if not all(n in product_tag_norms for n in requested_tag_norms):
-                        continue
+                if product_tags is not None:
+                    product["tags"] = product_tags
 
                 # Add the document ID
                 product["id"] = match.id
 
                 products.append(product)
 
+            self._set_cached_query(cache_key, products)
             logger.info(f"🔍 Found {len(products)} products for query: '{query}'")
             return products
 
@@ -518,95 +1225,251 @@ class PineconeClient:
 
     # ===== Support document-specific methods =====
 
-    def index_support_docs(self, docs: List[Dict[str, Any]]) -> int:
-        """Upsert multiple support documents"""
+    def index_support_docs(
+        self, docs: Iterable[Dict[str, Any]], document_chunk_size: int = 1000
+    ) -> int:
+        """Upsert multiple support documents
+
+        Accepts any iterable of documents and processes it in chunks of
+        document_chunk_size, so the full corpus never needs to be materialized.
+        A chunk's upserts stay in flight while the next chunk is embedded; at most one
+        chunk is pending at a time, which bounds memory.
+        """
         if not self.is_available():
             return 0
 
         successful_upserts = 0
-        vectors_to_upsert = []
+        in_flight = None
 
-        for doc in docs:
-            try:
-                # Create embedding
-                embedding = self._get_embedding(doc["content"])
-                if not embedding:
-                    continue
+        for doc_chunk in chunks(docs, document_chunk_size):
+            vectors_to_upsert = []
 
-                # Create unique ID
-                doc_id = doc.get("faq_id", str(uuid.uuid4()))
+            # Embed the chunk's document contents in batched requests
+            doc_chunk = [doc for doc in doc_chunk if doc.get("content")]
+            embeddings = self._get_embeddings([doc["content"] for doc in doc_chunk])
 
-                # Prepare metadata
-                metadata = {
-                    "type": "support",  # Add type to distinguish from products
-                    "doc_type": doc.get("type", ""),
-                    "category": doc.get("category", ""),
-                    "source": doc.get("source", ""),
-                    "content": doc["content"][:1000],  # Limit content size in metadata
-                }
+            for doc, embedding in zip(doc_chunk, embeddings):
+                try:
+                    if not embedding:
+                        continue
+
+                    # Create unique ID
+                    doc_id = doc.get("faq_id", str(uuid.uuid4()))
+
+                    # Prepare metadata
+                    metadata = {
+                        "type": "support",  # Add type to distinguish from products
+                        "doc_type": doc.get("type", ""),
+                        "category": doc.get("category", ""),
+                        "source": doc.get("source", ""),
+                        # Limit content size in metadata (byte-accurate)
+                        "content": truncate_utf8(doc["content"], SUPPORT_CONTENT_MAX_BYTES),
+                    }
 
-                if "product_count" in doc:
-                    metadata["product_count"] = doc["product_count"]
+                    if "product_count" in doc:
+                        metadata["product_count"] = doc["product_count"]
 
-                vectors_to_upsert.append({"id": doc_id, "values": embedding, "metadata": metadata})
+                    vectors_to_upsert.append(
+                        {"id": doc_id, "values": embedding, "metadata": metadata}
+                    )
+
+                except Exception as e:
+                    logger.error(f"Error preparing document for upsert: {e}")
+                    continue
 
+            # Finish the previous chunk's upserts, then start this chunk's (v6.x async API)
+            successful_upserts += self._finish_support_upserts(in_flight)
+            in_flight = []
+            try:
+                if vectors_to_upsert:
+                    self._submit_upserts(vectors_to_upsert, in_flight)
             except Exception as e:
-                logger.error(f"Error preparing document for upsert: {e}")
-                continue
+                # Chunks submitted before the failure still count once they complete
+                successful_upserts += self._finish_support_upserts(in_flight)
+                in_flight = None
+                logger.error(f"Error during batch upsert: {e}")
 
-        # Batch upsert with v6.x API
-        try:
-            if vectors_to_upsert:
-                self.index.upsert(vectors=vectors_to_upsert)
-                successful_upserts = len(vectors_to_upsert)
-                logger.info(f"✅ Upserted {successful_upserts} support documents to Pinecone")
-        except Exception as e:
-            logger.error(f"Error during batch upsert: {e}")
+        successful_upserts += self._finish_support_upserts(in_flight)
 
+        if successful_upserts:
+            self._invalidate_index_stats()
+            logger.info(f"✅ Upserted {successful_upserts} support documents to Pinecone")
         return successful_upserts
 
+    def _finish_support_upserts(self, pending) -> int:
+        """Wait for a support chunk's submitted upserts; errors are logged, not raised"""
+        if not pending:
+            return 0
+        return self._wait_upserts(pending, raise_errors=False)
+
+    def _upsert_parallel(self, vectors: List[Dict[str, Any]]) -> int:
+        """Upsert vectors in chunks of batch_size, issuing the requests concurrently
+
+        Submissions are paced by a byte-rate token bucket to stay under Pinecone's
+        throughput cap. A chunk rejected for rate limiting is retried on its own with
+        exponential backoff; any other failure is raised.
+        """
+        pending = []
+        try:
+            self._submit_upserts(vectors, pending)
+        except Exception:
+            # Let the chunks already sent finish before surfacing the failure
+            self._wait_upserts(pending, raise_errors=False)
+            raise
+        return self._wait_upserts(pending)
+
+    def _submit_upserts(
+        self, vectors: List[Dict[str, Any]], pending: Optional[List[Any]] = None
+    ) -> List[Any]:
+        """Start async upserts of vectors in batch_size chunks; returns (chunk, result) pairs
+
+        Pairs are appended to pending as each chunk is submitted, so if a later
+        submission raises, the caller still holds the upserts already in flight.
+        """
+        if pending is None:
+            pending = []
+        for chunk in chunks(vectors, self.batch_size):
+            if not self.use_grpc:
+                chunk = self._round_values_for_json(chunk)
+            self._upsert_bucket.consume(self._estimate_upsert_bytes(chunk))
+            pending.append((chunk, self.index.upsert(vectors=chunk, async_req=True)))
+        return pending
+
+    @staticmethod
+    def _round_values_for_json(chunk: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Copy a chunk with embedding values rounded to REST_UPSERT_VALUE_DECIMALS
+
+        A float32 value printed as JSON takes ~20 characters; rounded it takes ~9. The
+        relative error (~1e-5 on unit-normalized embeddings) is far below what fp16 storage
+        would cost and does not affect cosine ranking in practice.
+        """
+        values = np.round(
+            np.asarray([vector["values"] for vector in chunk], dtype=np.float64),
+            REST_UPSERT_VALUE_DECIMALS,
+        ).tolist()
+        return [{**vector, "values": rounded} for vector, rounded in zip(chunk, values)]
+
+    @staticmethod
+    def _estimate_upsert_bytes(chunk: List[Dict[str, Any]]) -> int:
+        """Estimate a chunk's request size for rate pacing without serializing the vectors
+
+        Only the (small) metadata is serialized; embedding values are costed at
+        UPSERT_BYTES_PER_VALUE each, which errs on the high side for JSON and gRPC alike.
+        """
+        return sum(
+            len(vector["values"]) * UPSERT_BYTES_PER_VALUE
+            + len(json.dumps(vector.get("metadata") or {}))
+            + len(vector["id"])
+            for vector in chunk
+        )
+
+    def _wait_upserts(self, pending: List[Any], raise_errors: bool = True) -> int:
+        """Wait for submitted upserts, retrying rate-limited chunks; returns vectors upserted
+
+        Every submitted chunk is waited for before the first failure is raised, so no
+        upsert is still writing in the background once the caller sees the error. With
+        raise_errors=False failures are logged instead and the completed count returned.
+        """
+        upserted = 0
+        first_error = None
+        for chunk, result in pending:
+            try:
+                try:
+                    # gRPC returns futures (.result()), REST returns ApplyResult (.get())
+                    if hasattr(result, "result"):
+                        result.result()
+                    else:
+                        result.get()
+                except Exception as e:
+                    if not self._is_rate_limited(e):
+                        raise
+                    self._retry_upsert(chunk)
+                upserted += len(chunk)
+            except Exception as e:
+                if not raise_errors:
+                    logger.error(f"Error during batch upsert: {e}")
+                elif first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+        return upserted
+
+    def _retry_upsert(self, chunk: List[Dict[str, Any]]) -> None:
+        """Retry a single rate-limited upsert chunk with exponential backoff"""
+        for attempt in range(1, UPSERT_MAX_RETRIES + 1):
+            delay = 2 ** (attempt - 1) + random.uniform(0, 0.5)
+            logger.warning(
+                f"Pinecone upsert rate limited, retrying chunk of {len(chunk)} in {delay:.1f}s "
+                f"(attempt {attempt}/{UPSERT_MAX_RETRIES})"
+            )
+            time.sleep(delay)
+            try:
+                self.index.upsert(vectors=chunk)
+                return
+            except Exception as e:
+                if not self._is_rate_limited(e) or attempt == UPSERT_MAX_RETRIES:
+                    raise
+
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        """Check whether a Pinecone error signals throughput/rate limiting"""
+        return getattr(error, "status", None) == 429 or "RESOURCE_EXHAUSTED" in str(error)
+
     def search_support(
-        self, query: str, top_k: int = 3, filter_dict: Dict = None
+        self,
+        query: str,
+        top_k: int = 3,
+        filter_dict: Dict = None,
+        query_embedding: Optional[List[float]] = None,
     ) -> List[Dict[str, Any]]:
-        """Search for relevant support documents"""
+        """Search for relevant support documents
+
+        Callers that already embedded the query can pass query_embedding to skip re-embedding.
+        """
         if not self.is_available():
             return []
 
         try:
+            # Add type filter to ensure we only get support documents (without mutating caller's dict)
+            filter_dict = {**(filter_dict or {}), "type": "support"}
+
+            # Identical recent searches skip embedding and Pinecone
+            cache_key = self._query_cache_key("support", query, top_k, filter_dict)
+            cached = self._get_cached_query(cache_key)
+            if cached is not None:
+                return cached
+
             # Create query embedding
-            query_embedding = self._get_embedding(query)
+            if query_embedding is None:
+                query_embedding = self._get_embedding(query)
             if not query_embedding:
                 return []
-
-            # Add type filter to ensure we only get support documents
-            if filter_dict is None:
-                filter_dict = {"type": "support"}
-            else:
-                filter_dict["type"] = "support"
+            if isinstance(query_embedding, FallbackEmbedding):
+                # Results for a placeholder vector are arbitrary: serve them, don't cache them
+                cache_key = None
 
             # Search Pinecone with v6.x API
             results = self.index.query(
                 vector=query_embedding, top_k=top_k, include_metadata=True, filter=filter_dict
             )
 
-            # Format results
-            support_docs = []
+            # Format results (product_count is None for docs not derived from products)
+            docs = []
             for match in results.matches:
-                doc = {
-                    "content": match.metadata.get("content", ""),
-                    "type": match.metadata.get("doc_type", ""),
-                    "category": match.metadata.get("category", ""),
-                    "source": match.metadata.get("source", ""),
-                    "score": float(match.score),
-                    "id": match.id,
-                }
-
-                if "product_count" in match.metadata:
-                    doc["product_count"] = match.metadata["product_count"]
-
-                support_docs.append(doc)
-
-            return support_docs
+                metadata = match.metadata
+                docs.append(
+                    {
+                        "content": metadata.get("content", ""),
+                        "type": metadata.get("doc_type", ""),
+                        "category": metadata.get("category", ""),
+                        "source": metadata.get("source", ""),
+                        "score": float(match.score),
+                        "id": match.id,
+                        "product_count": metadata.get("product_count"),
+                    }
+                )
+            self._set_cached_query(cache_key, docs)
+            return docs
 
         except Exception as e:
             logger.error(f"Error searching support documents: {e}")
@@ -620,7 +1483,7 @@ class PineconeClient:
             if not self.is_available():
                 return {"status": "unavailable", "message": "Pinecone not connected"}
 
-            stats = self.index.describe_index_stats()
+            stats = self._get_index_stats()
 
             return {
                 "status": "healthy",
@@ -646,8 +1509,9 @@ class PineconeClient:
 
         try:
             if filter_dict:
-                # Delete only vectors matching the filter
-                self.index.delete(filter=filter_dict)
+                # Delete only vectors matching the filter (page by page on large indexes)
+                if not self._delete_matching_paged(filter_dict):
+                    self.index.delete(filter=filter_dict)
                 logger.info(f"✅ Cleared vectors matching filter {filter_dict} from Pinecone index")
             else:
                 # Delete all vectors
@@ -657,6 +1521,60 @@ class PineconeClient:
         except Exception as e:
             logger.error(f"Error clearing index: {e}")
             return False
+        finally:
+            # A failed clear may still have deleted some vectors
+            self._invalidate_index_stats()
+
+    def _delete_matching_paged(self, filter_dict: Dict) -> bool:
+        """Delete vectors matching a filter in rounds of id-only queries plus deletes by id
+
+        Each round queries up to CLEAR_INDEX_QUERY_TOP_K matching ids (the filter runs
+        server-side; no values or metadata are transferred) and deletes them in pages of
+        CLEAR_INDEX_PAGE_SIZE ids on worker threads. Returns False when the caller should
+        send a single delete-by-filter instead: a small index, a failed request, or a round
+        that only finds ids already deleted (deletes not visible yet). That delete is
+        idempotent and removes whatever is left.
+        """
+        try:
+            if self._get_index_stats().total_vector_count < CLEAR_INDEX_PAGED_MIN_VECTORS:
+                return False
+        except Exception as e:
+            logger.debug("Paged delete unavailable, deleting by filter: %s", e)
+            return False
+
+        # Any non-zero vector works: only the filter decides which ids come back
+        probe = [1.0] + [0.0] * (self.dimension - 1)
+        deleted = set()
+        try:
+            with ThreadPoolExecutor(max_workers=CLEAR_INDEX_MAX_WORKERS) as executor:
+                while True:
+                    matches = self.index.query(
+                        vector=probe,
+                        top_k=CLEAR_INDEX_QUERY_TOP_K,
+                        filter=filter_dict,
+                        include_values=False,
+                        include_metadata=False,
+                    ).matches
+                    ids = [match.id for match in matches if match.id not in deleted]
+                    if not ids:
+                        if matches:
+                            return False
+                        break
+                    deleted.update(ids)
+                    list(
+                        executor.map(
+                            lambda page: self.index.delete(ids=page),
+                            chunks(ids, CLEAR_INDEX_PAGE_SIZE),
+                        )
+                    )
+                    if len(matches) < CLEAR_INDEX_QUERY_TOP_K:
+                        break
+        except Exception as e:
+            logger.warning(f"⚠️ Paged delete failed, deleting remaining vectors by filter: {e}")
+            return False
+
+        logger.debug("Deleted %d vectors in pages of %d ids", len(deleted), CLEAR_INDEX_PAGE_SIZE)
+        return True
 
 
 # Factory function to create appropriate client instances
@@ -673,6 +1591,23 @@ def create_pinecone_client(index_type: str = "products") -> PineconeClient:
     return PineconeClient(index_type=index_type)
 
 
-# Global instances for backward compatibility
-pinecone_products_client = create_pinecone_client("products")
-pinecone_support_client = create_pinecone_client("support")
+# Global instances for backward compatibility, created on first access (PEP 562) so that
+# importing this module does not connect to Pinecone: processes and tools that never use
+# a client (webhook, CLI --help, tests) skip the describe_index_stats round trip
+_GLOBAL_CLIENT_TYPES = {
+    "pinecone_products_client": "products",
+    "pinecone_support_client": "support",
+}
+_global_clients: Dict[str, PineconeClient] = {}
+_global_clients_lock = threading.Lock()
+
+
+def __getattr__(name: str) -> PineconeClient:
+    index_type = _GLOBAL_CLIENT_TYPES.get(name)
+    if index_type is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _global_clients_lock:
+        client = _global_clients.get(name)
+        if client is None:
+            client = _global_clients[name] = create_pinecone_client(index_type)
+        return client